@@ -0,0 +1,273 @@
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+from kiosk import count_widgets
+from synthetic_catalog import generate_catalog, parse_sizes
+
+
+def start_virtual_display(width=1920, height=1080):
+    if os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        raise SystemExit("No DISPLAY set and Xvfb is not installed; install xvfb or run under xvfb-run")
+    for display_number in range(99, 140):
+        if Path(f"/tmp/.X11-unix/X{display_number}").exists():
+            continue
+        process = subprocess.Popen(
+            [xvfb, f":{display_number}", "-screen", "0", f"{width}x{height}x24", "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            if Path(f"/tmp/.X11-unix/X{display_number}").exists():
+                os.environ["DISPLAY"] = f":{display_number}"
+                return process
+            if process.poll() is not None:
+                break
+            time.sleep(0.05)
+        process.kill()
+    raise SystemExit("Could not start Xvfb")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(samples):
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def peak_rss_kb():
+    #imported here so the scripts that only borrow summarize still start on Windows
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def snapshot(root):
+    return {
+        "widgets": count_widgets(root),
+        "photo_images": len(root.tk.call("image", "names")),
+        "rss_peak_kb": peak_rss_kb(),
+    }
+
+
+class AppDriver:
+    def __init__(self, app):
+        self.app = app
+        self.root = app.root
+
+    def timed(self, action, *args):
+        start = time.perf_counter()
+        action(*args)
+        self.root.update()
+        return time.perf_counter() - start
+
+    def settle(self, timeout=30.0):
+        #wait until every background image job has been delivered to the Tk thread
+        start = time.perf_counter()
+        deadline = start + timeout
+        while any(self.app.image_loader.pending.values()) and time.perf_counter() < deadline:
+            self.root.update()
+            time.sleep(0.001)
+        self.root.update()
+        return time.perf_counter() - start
+
+
+def bench_screens(driver, catalog_size, repeats, navigation_steps, key_interval_ms, rng):
+    app = driver.app
+    results = {}
+    snapshots = {}
+
+    gallery_open = []
+    gallery_settle = []
+    welcome = []
+    for _ in range(repeats):
+        gallery_open.append(driver.timed(app.show_poster_gallery))
+        gallery_settle.append(driver.settle())
+        welcome.append(driver.timed(app.create_welcome_screen))
+    results["show_poster_gallery"] = summarize(gallery_open)
+    results["show_poster_gallery_settled"] = summarize(gallery_settle)
+    results["create_welcome_screen"] = summarize(welcome)
+    snapshots["after_gallery"] = snapshot(driver.root)
+
+    written = [driver.timed(app.show_written_response) for _ in range(repeats)]
+    results["show_written_response"] = summarize(written)
+
+    detail = []
+    for _ in range(repeats):
+        poster = app.posters[rng.randrange(catalog_size)]
+        detail.append(driver.timed(app.show_poster_detail, poster))
+    results["show_poster_detail"] = summarize(detail)
+
+    app.show_poster_detail(app.posters[0])
+    driver.root.update()
+    forward = []
+    backward = []
+    for _ in range(min(navigation_steps, catalog_size - 1)):
+        forward.append(driver.timed(app.show_next_poster))
+        if key_interval_ms:
+            time.sleep(key_interval_ms / 1000)
+            driver.root.update()
+    for _ in range(min(navigation_steps, catalog_size - 1)):
+        backward.append(driver.timed(app.show_previous_poster))
+        if key_interval_ms:
+            time.sleep(key_interval_ms / 1000)
+            driver.root.update()
+    results["show_next_poster"] = summarize(forward)
+    results["show_previous_poster"] = summarize(backward)
+    snapshots["after_navigation"] = snapshot(driver.root)
+    return results, snapshots
+
+
+def bench_image_pipeline(app, image_paths, detail_size, thumb_size, repeats):
+    results = {}
+    for label, (max_width, max_height) in (("detail", detail_size), ("thumbnail", thumb_size)):
+        samples = []
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for image_path in image_paths:
+                #cold every time: we are measuring decode + resize + PhotoImage, not the cache
+                app.image_cache.clear()
+                call_start = time.perf_counter()
+                app.load_and_resize_image(image_path, max_width, max_height)
+                samples.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start
+        summary = summarize(samples)
+        summary["images_per_second"] = len(samples) / elapsed if elapsed else 0.0
+        results[f"load_and_resize_image_{label}"] = summary
+    return results
+
+
+def compare(report, baseline, threshold):
+    regressions = []
+    for section in ("screens", "image_pipeline"):
+        for name, current in report.get(section, {}).items():
+            previous = baseline.get(section, {}).get(name)
+            if not previous or "p95_ms" not in previous or "p95_ms" not in current:
+                continue
+            if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+                regressions.append(f"{section}.{name}: p95 {previous['p95_ms']:.1f} ms -> {current['p95_ms']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the poster analysis tool.")
+    parser.add_argument("--count", default=200, type=int, help="synthetic catalog size")
+    parser.add_argument("--unique-images", default=24, type=int)
+    parser.add_argument("--sizes", default="600x800,1200x1600,2400x3200", type=parse_sizes)
+    parser.add_argument("--repeats", default=10, type=int)
+    parser.add_argument("--navigation-steps", default=20, type=int)
+    parser.add_argument("--key-interval-ms", default=0, type=int, help="pause between simulated arrow-key presses")
+    parser.add_argument("--work-dir", default=None, type=Path, help="reuse a synthetic catalog between runs")
+    parser.add_argument("--output", default=None, type=Path)
+    parser.add_argument("--baseline", default=None, type=Path, help="earlier report to compare p95 latencies against")
+    parser.add_argument("--threshold", default=0.2, type=float, help="allowed p95 slowdown before flagging")
+    parser.add_argument("--seed", default=0, type=int)
+    parser.add_argument("--decode-backend", choices=("thread", "process"), default="thread")
+    parser.add_argument("--thumbnail-atlas", action="store_true", help="serve gallery tiles from the mapped atlas")
+    args = parser.parse_args()
+
+    display = start_virtual_display()
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix="apush-bench-"))
+    try:
+        import tkinter as tk
+        import PIL
+        from main import PosterAnalysisTool
+        from decode import decode_stats
+
+        json_path = generate_catalog(work_dir, args.count, args.sizes, args.unique_images, args.seed)
+        rng = random.Random(args.seed)
+
+        startup_start = time.perf_counter()
+        root = tk.Tk()
+        #the synthetic catalog is the app's data dir from the start, so startup loads and indexes it and every
+        #cache write lands in the work dir instead of the repo
+        app = PosterAnalysisTool(
+            root, live_reload=False, decode_backend=args.decode_backend, thumbnail_atlas=args.thumbnail_atlas,
+            data_dir=json_path.parent, cache_dir=work_dir / "cache"
+        )
+        driver = AppDriver(app)
+        while "startup complete" not in app.profile.marks:
+            root.update()
+            time.sleep(0.001)
+        startup = time.perf_counter() - startup_start
+
+        if args.thumbnail_atlas:
+            #startup queued the atlas build for the synthetic catalog; the screens are timed once it is in place
+            driver.settle(timeout=300)
+        screens, snapshots = bench_screens(
+            driver, len(app.posters), args.repeats, args.navigation_steps, args.key_interval_ms, rng
+        )
+        image_paths = sorted({poster.image_path for poster in app.posters})
+        pipeline = bench_image_pipeline(app, image_paths, app.detail_image_size(), (150, 100), max(args.repeats // 5, 1))
+
+        report = {
+            "environment": {
+                "python": platform.python_version(),
+                "pillow": PIL.__version__,
+                "tk": root.tk.call("info", "patchlevel"),
+                "platform": platform.platform(),
+                "catalog_size": len(app.posters),
+                "unique_images": len(image_paths),
+                "screen": f"{root.winfo_screenwidth()}x{root.winfo_screenheight()}",
+                "decode_backend": args.decode_backend,
+                "thumbnail_atlas": args.thumbnail_atlas,
+            },
+            "startup_ms": startup * 1000,
+            "screens": screens,
+            "image_pipeline": pipeline,
+            "snapshots": {**snapshots, "final": snapshot(root)},
+            "image_cache": app.image_cache.stats(),
+            #how often each decode route ran and what it cost, across the screens and the image pipeline above
+            "decode_routes": decode_stats.summary(),
+        }
+        app.on_close()
+    finally:
+        if display is not None:
+            display.terminate()
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    print(output)
+
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+from pathlib import Path
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_app import start_virtual_display, summarize
+from synthetic_catalog import generate_catalog, parse_sizes
+from decode import decode_resized
+from thumbnail_atlas import ThumbnailAtlas, build_atlas
+from thumbnail_cache import ThumbnailCache
+
+
+def create_thumbnail(image_path, max_width, max_height):
+    return decode_resized(image_path, max_width, max_height, "fast")
+
+
+class PhotoStage:
+    #the Tk half of a gallery open: a new PhotoImage per tile on the per-file path, a paste into the
+    #tile's existing PhotoImage on the atlas path
+    def __init__(self, pool_size):
+        import tkinter as tk
+        from PIL import ImageTk
+        self.root = tk.Tk()
+        self.image_tk = ImageTk
+        self.pool = [None] * pool_size
+
+    def per_file(self, images):
+        return [self.image_tk.PhotoImage(image) for image in images]
+
+    def atlas(self, images):
+        for slot, image in enumerate(images):
+            photo_image = self.pool[slot]
+            if photo_image is None or (photo_image.width(), photo_image.height()) != image.size:
+                self.pool[slot] = self.image_tk.PhotoImage(image)
+            else:
+                photo_image.paste(image)
+
+    def close(self):
+        self.root.destroy()
+
+
+def open_per_file(cache, screen, thumbnail_size, photos):
+    images = [cache.get_or_create(path, *thumbnail_size, "fast", create_thumbnail) for poster_id, path in screen]
+    if photos is not None:
+        photos.per_file(images)
+
+
+def open_atlas(atlas_dir, screen, thumbnail_size, photos):
+    #a gallery open in a fresh process: map the atlas, then slice each tile out of it
+    atlas = ThumbnailAtlas(atlas_dir, thumbnail_size)
+    atlas.open()
+    images = [atlas.image(poster_id, path) for poster_id, path in screen]
+    if photos is not None:
+        photos.atlas(images)
+    atlas.close()
+
+
+def timed(action, *args):
+    start = time.perf_counter()
+    action(*args)
+    return time.perf_counter() - start
+
+
+def bench(work_dir, entries, thumbnail_size, screen_size, repeats, photos):
+    screens = [entries[start:start + screen_size] for start in range(0, len(entries), screen_size)]
+    first_screen = screens[0]
+    results = {}
+
+    #cold: nothing cached yet, so the per-file path decodes and writes one PNG per tile, and the atlas has to be
+    #built for the whole catalog before its first open
+    cold_per_file, cold_build, cold_atlas = [], [], []
+    for repeat in range(repeats):
+        cache_dir = work_dir / f"thumbnails-{repeat}"
+        atlas_dir = work_dir / f"atlas-{repeat}"
+        cold_per_file.append(timed(open_per_file, ThumbnailCache(cache_dir), first_screen, thumbnail_size, photos))
+        cold_build.append(timed(build_atlas, atlas_dir, thumbnail_size, entries, create_thumbnail))
+        cold_atlas.append(timed(open_atlas, atlas_dir, first_screen, thumbnail_size, photos))
+    results["cold_first_screen_per_file"] = summarize(cold_per_file)
+    results["cold_atlas_build_full_catalog"] = summarize(cold_build)
+    results["cold_first_screen_atlas_after_build"] = summarize(cold_atlas)
+
+    #warm: every thumbnail already on disk, as on any gallery open after the first
+    cache = ThumbnailCache(work_dir / "thumbnails-0")
+    atlas_dir = work_dir / "atlas-0"
+    for screen in screens:
+        open_per_file(cache, screen, thumbnail_size, None)
+    results["warm_first_screen_per_file"] = summarize(
+        [timed(open_per_file, cache, first_screen, thumbnail_size, photos) for _ in range(repeats)]
+    )
+    results["warm_first_screen_atlas"] = summarize(
+        [timed(open_atlas, atlas_dir, first_screen, thumbnail_size, photos) for _ in range(repeats)]
+    )
+    results["warm_scroll_catalog_per_file"] = summarize(
+        [sum(timed(open_per_file, cache, screen, thumbnail_size, photos) for screen in screens) for _ in range(repeats)]
+    )
+    results["warm_scroll_catalog_atlas"] = summarize(
+        [sum(timed(open_atlas, atlas_dir, screen, thumbnail_size, photos) for screen in screens) for _ in range(repeats)]
+    )
+    results["incremental_rebuild_unchanged"] = summarize(
+        [timed(build_atlas, atlas_dir, thumbnail_size, entries, create_thumbnail) for _ in range(repeats)]
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare gallery opens from the thumbnail atlas and the per-file cache.")
+    parser.add_argument("--count", default=500, type=int, help="synthetic catalog size")
+    parser.add_argument("--unique-images", default=None, type=int)
+    parser.add_argument("--sizes", default="600x800,1200x1600,2400x3200", type=parse_sizes)
+    parser.add_argument("--thumbnail-size", default="150x100", type=lambda text: tuple(parse_sizes(text)[0]))
+    parser.add_argument("--screen", default=48, type=int, help="tiles visible on one gallery screen")
+    parser.add_argument("--repeats", default=5, type=int)
+    parser.add_argument("--no-tk", action="store_true", help="leave out the PhotoImage stage")
+    parser.add_argument("--work-dir", default=None, type=Path, help="reuse a synthetic catalog between runs")
+    parser.add_argument("--output", default=None, type=Path)
+    parser.add_argument("--seed", default=0, type=int)
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix="apush-atlas-"))
+    display = None
+    photos = None
+    try:
+        json_path = generate_catalog(work_dir, args.count, args.sizes, args.unique_images, args.seed)
+        with open(json_path, "r", encoding="utf-8") as file:
+            entries = [(poster["id"], poster["image_path"]) for poster in json.load(file)]
+        for stale in [*work_dir.glob("thumbnails-*"), *work_dir.glob("atlas-*")]:
+            shutil.rmtree(stale, ignore_errors=True)
+        if not args.no_tk:
+            try:
+                display = start_virtual_display()
+                photos = PhotoStage(args.screen)
+            except (SystemExit, ImportError, RuntimeError) as e:
+                print(f"Skipping the PhotoImage stage: {e}", file=sys.stderr)
+        results = bench(work_dir, entries, args.thumbnail_size, args.screen, args.repeats, photos)
+    finally:
+        if photos is not None:
+            photos.close()
+        if display is not None:
+            display.terminate()
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "catalog_size": len(entries),
+            "thumbnail_size": "x".join(str(side) for side in args.thumbnail_size),
+            "screen_tiles": args.screen,
+            "photo_stage": photos is not None,
+            #the OS page cache is not dropped between runs, so "cold" means cold application caches
+            "page_cache": "not dropped",
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+BENCH_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_app import summarize
+from synthetic_catalog import generate_catalog, parse_sizes
+
+
+class Client:
+    #one keep-alive connection that remembers ETags like a browser would
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.etags = {}
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def get(self, path, revalidate=True):
+        request = f"GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+        if revalidate and path in self.etags:
+            request += f"If-None-Match: {self.etags[path]}\r\n"
+        self.writer.write((request + "\r\n").encode("latin-1"))
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            name, separator, value = line.partition(":")
+            if separator:
+                headers[name.strip().lower()] = value.strip()
+        body = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if "etag" in headers:
+            self.etags[path] = headers["etag"]
+        return status, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+async def run_client(host, port, requests, widths, popular, rng, results, start_event):
+    #each student opens the gallery, then keeps returning to a handful of popular posters at the sizes their
+    #screens ask for; repeats carry If-None-Match
+    client = Client(host, port)
+    await client.connect()
+    await start_event.wait()
+    try:
+        started = time.perf_counter()
+        status, body = await client.get("/api/posters")
+        results["latencies"].append(time.perf_counter() - started)
+        results["statuses"][status] = results["statuses"].get(status, 0) + 1
+        posters = json.loads(body)
+
+        for _ in range(requests):
+            poster = posters[rng.randrange(min(popular, len(posters)))]
+            choice = rng.random()
+            if choice < 0.4 and poster["thumbnail"]:
+                path = poster["thumbnail"]
+            elif choice < 0.6:
+                path = f"/api/posters/{poster['id']}"
+            elif choice < 0.7:
+                path = poster["page"]
+            elif poster["thumbnail"]:
+                path = f"/images/{poster['id']}-{rng.choice(widths)}.jpg"
+            else:
+                continue
+            results["paths"].add(path)
+            started = time.perf_counter()
+            status, body = await client.get(path)
+            results["latencies"].append(time.perf_counter() - started)
+            results["statuses"][status] = results["statuses"].get(status, 0) + 1
+            results["bytes"] += len(body)
+    finally:
+        await client.close()
+
+
+async def fetch_stats(host, port):
+    client = Client(host, port)
+    await client.connect()
+    try:
+        status, body = await client.get("/api/stats", revalidate=False)
+        return json.loads(body)
+    finally:
+        await client.close()
+
+
+async def load_test(host, port, clients, requests, widths, popular, seed):
+    rng = random.Random(seed)
+    results = {"latencies": [], "statuses": {}, "paths": set(), "bytes": 0}
+    before = await fetch_stats(host, port)
+    start_event = asyncio.Event()
+    tasks = [
+        asyncio.create_task(
+            run_client(host, port, requests, widths, popular, random.Random(rng.random()), results, start_event)
+        )
+        for _ in range(clients)
+    ]
+    #all connections are open before the first request, so the first wave really is concurrent
+    await asyncio.sleep(0.2)
+    started = time.perf_counter()
+    start_event.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    after = await fetch_stats(host, port)
+
+    renders = after["cache"]["renders"] - before["cache"]["renders"]
+    return {
+        "clients": clients,
+        "requests": len(results["latencies"]),
+        "seconds": elapsed,
+        "requests_per_second": len(results["latencies"]) / elapsed if elapsed else 0.0,
+        "latency": summarize(results["latencies"]),
+        "statuses": results["statuses"],
+        "megabytes": results["bytes"] / 1024 / 1024,
+        "distinct_paths": len(results["paths"]),
+        "server_renders": renders,
+        "server_joins": after["cache"]["joins"] - before["cache"]["joins"],
+        "server_not_modified": after["not_modified"] - before["not_modified"],
+    }
+
+
+def wait_for_server(host, port, process, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("The server exited during startup")
+        try:
+            return asyncio.run(fetch_stats(host, port))
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"The server did not answer on {host}:{port} within {timeout:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the poster server with many concurrent classroom clients.")
+    parser.add_argument("--url", default=None, help="test a server that is already running, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--port", default=8765, type=int, help="port for the server this script starts")
+    parser.add_argument("--clients", default=30, type=int)
+    parser.add_argument("--requests", default=100, type=int, help="requests per client after the first gallery load")
+    parser.add_argument("--popular", default=20, type=int, help="how many posters the clients spread their requests over")
+    parser.add_argument("--widths", default="320,640,1280", help="detail widths the clients ask for")
+    parser.add_argument("--count", default=200, type=int, help="synthetic catalog size when starting a server")
+    parser.add_argument("--unique-images", default=24, type=int)
+    parser.add_argument("--sizes", default="600x800,1200x1600,2400x3200", type=parse_sizes)
+    parser.add_argument("--work-dir", default=None, type=Path, help="reuse a synthetic catalog between runs")
+    parser.add_argument("--workers", default=None, type=int, help="decode processes for the started server")
+    parser.add_argument("--rounds", default=2, type=int, help="the first round is cold, the rest show the warm cache")
+    parser.add_argument("--output", default=None, type=Path)
+    parser.add_argument("--seed", default=0, type=int)
+    args = parser.parse_args()
+    widths = [int(width) for width in args.widths.split(",")]
+
+    process = None
+    work_dir = None
+    try:
+        if args.url:
+            parts = urlsplit(args.url)
+            host, port = parts.hostname, parts.port or 80
+        else:
+            host, port = "127.0.0.1", args.port
+            work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix="apush-load-"))
+            json_path = generate_catalog(work_dir, args.count, args.sizes, args.unique_images, args.seed)
+            command = [
+                sys.executable, str(APP_DIR / "server.py"), "--json", str(json_path),
+                "--posters-dir", str(work_dir / "posters"), "--cache-dir", str(work_dir / "cache"),
+                "--port", str(port),
+            ]
+            if args.workers:
+                command += ["--workers", str(args.workers)]
+            #a new process group on Windows, so CTRL_BREAK_EVENT reaches only the server
+            creationflags = subprocess.CREATE_NEW_PROCESS_GROUP if sys.platform == "win32" else 0
+            process = subprocess.Popen(command, stdout=subprocess.DEVNULL, creationflags=creationflags)
+            wait_for_server(host, port, process)
+        rounds = [
+            asyncio.run(load_test(host, port, args.clients, args.requests, widths, args.popular, args.seed + round_index))
+            for round_index in range(args.rounds)
+        ]
+    finally:
+        if process is not None:
+            #Ctrl+C lets the server shut its decode workers down; terminate would orphan them
+            process.send_signal(signal.SIGINT if sys.platform != "win32" else signal.CTRL_BREAK_EVENT)
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        if work_dir is not None and args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps({"rounds": rounds}, indent=2)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
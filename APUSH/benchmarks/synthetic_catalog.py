@@ -0,0 +1,69 @@
+from pathlib import Path
+from PIL import Image, ImageDraw
+import argparse
+import json
+import random
+
+DEFAULT_SIZES = [(600, 800), (1200, 1600), (2400, 3200)]
+FORMATS = [("JPEG", ".jpg"), ("PNG", ".png")]
+
+
+def make_poster_image(width, height, rng):
+    image = Image.new("RGB", (width, height), tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    #a few random shapes so the encoders have real work to do
+    for _ in range(12):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = x0 + rng.randrange(width // 2 + 1), y0 + rng.randrange(height // 2 + 1)
+        draw.rectangle((x0, y0, x1, y1), fill=tuple(rng.randrange(256) for _ in range(3)))
+    return image
+
+
+def generate_catalog(out_dir, count, sizes=None, unique_images=None, seed=0):
+    #unique_images caps how many distinct files are written; entries past it reuse them round-robin
+    rng = random.Random(seed)
+    sizes = sizes or DEFAULT_SIZES
+    out_dir = Path(out_dir)
+    posters_dir = out_dir / "posters"
+    posters_dir.mkdir(parents=True, exist_ok=True)
+    unique_images = min(unique_images or count, count)
+
+    image_paths = []
+    for index in range(unique_images):
+        width, height = sizes[index % len(sizes)]
+        save_format, extension = FORMATS[index % len(FORMATS)]
+        image_path = posters_dir / f"synthetic{index}{extension}"
+        if not image_path.exists():
+            make_poster_image(width, height, rng).save(image_path, format=save_format)
+        image_paths.append(image_path)
+
+    posters = [
+        {
+            "id": index + 1,
+            "title": f"Synthetic Poster {index + 1}",
+            "image_path": str(image_paths[index % unique_images]),
+            "explanation": " ".join(rng.choice(["cold", "war", "poster", "soviet", "american", "propaganda"]) for _ in range(60)),
+            "designer": f"Designer {index % 50}",
+            "year": 1947 + index % 45,
+        }
+        for index in range(count)
+    ]
+    json_path = out_dir / "posters.json"
+    with open(json_path, "w", encoding="utf-8") as file:
+        json.dump(posters, file, indent=2)
+    return json_path
+
+
+def parse_sizes(text):
+    return [tuple(int(part) for part in size.split("x")) for size in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic posters.json with generated images.")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--count", default=100, type=int)
+    parser.add_argument("--unique-images", default=None, type=int)
+    parser.add_argument("--sizes", default="600x800,1200x1600,2400x3200", type=parse_sizes)
+    parser.add_argument("--seed", default=0, type=int)
+    args = parser.parse_args()
+    print(generate_catalog(args.out_dir, args.count, args.sizes, args.unique_images, args.seed))
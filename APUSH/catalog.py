@@ -0,0 +1,133 @@
+from bisect import insort
+
+
+class PosterRecord:
+    __slots__ = ("id", "title", "image_path", "explanation", "designer", "year")
+
+    def __init__(self, id, title, image_path=None, explanation="", designer="Unknown", year=None):
+        self.id = id
+        self.title = title
+        self.image_path = image_path
+        self.explanation = explanation
+        self.designer = designer
+        self.year = year
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['id'],
+            data.get('title', ''),
+            data.get('image_path'),
+            data.get('explanation', ''),
+            data.get('designer', 'Unknown'),
+            data.get('year'),
+        )
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self):
+        return f"PosterRecord(id={self.id!r}, title={self.title!r})"
+
+
+class PosterCatalog:
+    def __init__(self, records=()):
+        self.records = []
+        self.positions = {}
+        self.by_year = {}
+        self.by_designer = {}
+        self._chronological = None
+        #set by backends that leave explanations on disk until a poster is opened
+        self.explanation_loader = None
+        for record in records:
+            self.add(record)
+
+    @classmethod
+    def from_dicts(cls, items):
+        return cls(PosterRecord.from_dict(item) for item in items)
+
+    def add(self, record):
+        if record.id in self.positions:
+            raise ValueError(f"Duplicate poster id {record.id!r}")
+        self.positions[record.id] = len(self.records)
+        self.records.append(record)
+        #secondary index lists stay sorted by position so filtered views keep catalog order
+        insort(self.by_year.setdefault(record.year, []), self.positions[record.id])
+        insort(self.by_designer.setdefault(record.designer, []), self.positions[record.id])
+        self._chronological = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __contains__(self, poster_id):
+        return poster_id in self.positions
+
+    def get(self, poster_id, default=None):
+        index = self.positions.get(poster_id)
+        return default if index is None else self.records[index]
+
+    def index_of(self, poster_id):
+        return self.positions.get(poster_id)
+
+    def next_of(self, poster_id):
+        index = self.positions.get(poster_id)
+        if index is None or index >= len(self.records) - 1:
+            return None
+        return self.records[index + 1]
+
+    def previous_of(self, poster_id):
+        index = self.positions.get(poster_id)
+        if index is None or index <= 0:
+            return None
+        return self.records[index - 1]
+
+    def explanation_of(self, record):
+        if record.explanation is None and self.explanation_loader is not None:
+            return self.explanation_loader(record.id)
+        return record.explanation or ""
+
+    def iter_explanations(self):
+        #bulk path for indexers, so lazy backends can stream every explanation in one query
+        if self.explanation_loader is not None and hasattr(self.explanation_loader, "iter_all"):
+            explanations = dict(self.explanation_loader.iter_all())
+            for record in self.records:
+                yield record, explanations.get(record.id, "") if record.explanation is None else record.explanation
+        else:
+            for record in self.records:
+                yield record, self.explanation_of(record)
+
+    def years(self):
+        return sorted(year for year in self.by_year if year is not None)
+
+    def designers(self):
+        return sorted(self.by_designer)
+
+    def filter(self, year=None, designer=None):
+        if year is None and designer is None:
+            return list(self.records)
+        candidates = None
+        if year is not None:
+            candidates = self.by_year.get(year, [])
+        if designer is not None:
+            designer_positions = self.by_designer.get(designer, [])
+            if candidates is None:
+                candidates = designer_positions
+            else:
+                wanted = set(designer_positions)
+                candidates = [index for index in candidates if index in wanted]
+        return [self.records[index] for index in candidates]
+
+    def chronological(self):
+        #undated posters sort last; built once and reused until the catalog changes
+        if self._chronological is None:
+            self._chronological = sorted(
+                self.records,
+                key=lambda record: (record.year is None, record.year or 0, self.positions[record.id])
+            )
+        return self._chronological
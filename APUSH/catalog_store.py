@@ -0,0 +1,113 @@
+from pathlib import Path
+import argparse
+import json
+import os
+import sqlite3
+from catalog import PosterCatalog, PosterRecord
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posters (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    designer TEXT,
+    year INTEGER,
+    image_path TEXT
+);
+CREATE INDEX IF NOT EXISTS posters_position ON posters (position);
+CREATE TABLE IF NOT EXISTS explanations (
+    id INTEGER PRIMARY KEY,
+    explanation TEXT NOT NULL
+);
+"""
+
+
+def convert_json_to_sqlite(json_path, db_path):
+    with open(json_path, "r", encoding="utf-8") as file:
+        posters = json.load(file)
+
+    temp_path = Path(db_path).with_suffix(".tmp")
+    temp_path.unlink(missing_ok=True)
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.executescript(SCHEMA)
+        with connection:
+            connection.executemany(
+                "INSERT INTO posters (id, position, title, designer, year, image_path) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (p["id"], position, p.get("title", ""), p.get("designer", "Unknown"), p.get("year"), p.get("image_path"))
+                    for position, p in enumerate(posters)
+                )
+            )
+            connection.executemany(
+                "INSERT INTO explanations (id, explanation) VALUES (?, ?)",
+                ((p["id"], p.get("explanation", "")) for p in posters)
+            )
+    finally:
+        connection.close()
+    os.replace(temp_path, db_path)
+    return len(posters)
+
+
+class SqliteExplanations:
+    #explanations stay on disk and are read one at a time when the detail view opens
+    def __init__(self, connection, db_path):
+        self.connection = connection
+        self.db_path = db_path
+
+    def __call__(self, poster_id):
+        row = self.connection.execute(
+            "SELECT explanation FROM explanations WHERE id = ?", (poster_id,)
+        ).fetchone()
+        return row[0] if row else ""
+
+    def iter_all(self):
+        #own connection so a background indexer never shares the UI thread's one
+        connection = connect_read_only(self.db_path)
+        try:
+            yield from connection.execute("SELECT id, explanation FROM explanations")
+        finally:
+            connection.close()
+
+    def close(self):
+        self.connection.close()
+
+
+def connect_read_only(db_path):
+    return sqlite3.connect(f"file:{Path(db_path).as_posix()}?mode=ro", uri=True, check_same_thread=False)
+
+
+def load_sqlite_catalog(db_path):
+    connection = connect_read_only(db_path)
+    cursor = connection.execute(
+        "SELECT id, title, image_path, designer, year FROM posters ORDER BY position"
+    )
+    catalog = PosterCatalog(
+        PosterRecord(poster_id, title, image_path, None, designer or "Unknown", year)
+        for poster_id, title, image_path, designer, year in cursor
+    )
+    catalog.explanation_loader = SqliteExplanations(connection, db_path)
+    return catalog
+
+
+def is_stale(json_path, db_path):
+    if not os.path.exists(db_path):
+        return True
+    if not os.path.exists(json_path):
+        return False
+    return os.path.getmtime(db_path) < os.path.getmtime(json_path)
+
+
+def main():
+    base_dir = Path(__file__).parent.absolute()
+    parser = argparse.ArgumentParser(description="Convert posters.json into the SQLite catalog.")
+    parser.add_argument("--json", default=base_dir / "data" / "posters.json", type=Path)
+    parser.add_argument("--db", default=base_dir / "data" / "posters.db", type=Path)
+    args = parser.parse_args()
+
+    count = convert_json_to_sqlite(args.json, args.db)
+    print(f"Wrote {count} posters to {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+HISTORICAL_TEXT = """The Cold War (1947-1991) was a period of great tension between the Soviet Union and the US and their respective allies. Propaganda posters played a crucial role in shaping public opinion on both sides.
+
+Key Themes in Cold War Propaganda:
+
+1. Ideological Conflict: Posters emphasized the superiority of capitalism/democracy or communism, portraying the opposing system as oppressive or immoral.
+
+2. Nuclear Threat: Many posters addressed the fear of nuclear war, either by promoting disarmament or by portraying the enemy as an aggressor.
+
+3. Economic Competition: Posters often contrasted the prosperity of one system with the supposed failures of the other.
+
+4. Patriotism and Defense: Many posters encouraged military service or civil defense preparedness.
+
+5. Use of stereotypes: Posters would use popular figures that were fictional or real, such as Uncle Sam. 
+
+The posters reveal how each side wanted to define itself in opposition to the other, using powerful imagery and easy to understand messages to appeal to emotions rather than rational argument."""
+
+RESULTS_TEXT = """
+
+    RESULTS OF PROPAGANDA:
+
+    1. Changed Public Opinion: Propaganda deepened the divide between capitalist and communist ideologies, making compromise more difficult.
+    2. Increased Military Spending: posters contributed to the arms race and increased defense budgets in both side.
+    3. Cultural Stereotypes: Propaganda created lasting stereotypes about both sides that are still present even today.
+    4. Political Mobilization: Posters were effective at getting citizens to get behind government policies and military actions.
+    5. Distrust in Media: The extremist propaganda led many to become skeptical of all government messaging, a legacy that continues in modern politics.
+    6. Artistic Legacy: While serving political purposes, these posters also represent significant works of graphic design and political art.
+
+    According to http://large.stanford.edu/courses/2017/ph241/le2/, Exploring the Impact of Propaganda during the Cold War by Professor Adrien Ivan,
+    sentiment towards the other side became much more prominent, as American were becoming increasingly radical towards soviet ideas, and vice versa.
+    Propaganda also puposely justified the arms race.
+    """
+
+#(poster file, caption) pairs shown beside the written response
+RESPONSE_FIGURES = (
+    ("poster1.jpg", "Example of Soviet propaganda poster"),
+    ("poster3.jpg", "Example of American propaganda poster"),
+)
@@ -0,0 +1,77 @@
+from PIL import Image
+import threading
+import time
+from tracing import tracer
+
+#resample filter, how much larger than the target draft/reduce may leave the image, and reducing_gap for resize
+DECODE_MODES = {
+    "fast": (Image.BILINEAR, 1, None),
+    "quality": (Image.LANCZOS, 2, 3.0),
+}
+
+
+class DecodeStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def record(self, route, seconds):
+        with self.lock:
+            count, total = self.routes.get(route, (0, 0.0))
+            self.routes[route] = (count + 1, total + seconds)
+
+    def summary(self):
+        with self.lock:
+            return {
+                route: {"count": count, "total_ms": total * 1000, "mean_ms": total * 1000 / count}
+                for route, (count, total) in self.routes.items()
+            }
+
+    def report(self):
+        lines = ["Decode routes:"]
+        for route, stats in sorted(self.summary().items(), key=lambda item: -item[1]["total_ms"]):
+            lines.append(
+                f"  {route:<24}{stats['count']:6d} x {stats['mean_ms']:7.1f} ms = {stats['total_ms']:9.1f} ms"
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        with self.lock:
+            self.routes = {}
+
+
+decode_stats = DecodeStats()
+
+
+def fit_size(width, height, max_width, max_height):
+    ratio = min(max_width/width, max_height/height)
+    return max(int(width * ratio), 1), max(int(height * ratio), 1)
+
+
+def decode_resized(image_path, max_width, max_height, mode="quality"):
+    resample, headroom, reducing_gap = DECODE_MODES[mode]
+    start = time.perf_counter()
+
+    with tracer.span("decode", path=image_path) as span:
+        image = Image.open(image_path)
+        new_width, new_height = fit_size(image.width, image.height, max_width, max_height)
+        route = "full"
+
+        if new_width * headroom < image.width and new_height * headroom < image.height:
+            if image.format == "JPEG":
+                #libjpeg scales by 1/2, 1/4 or 1/8 in the DCT domain, never below the requested size
+                image.draft(image.mode, (new_width * headroom, new_height * headroom))
+                route = "jpeg-draft"
+            else:
+                factor = min(image.width // (new_width * headroom), image.height // (new_height * headroom))
+                if factor >= 2 and image.mode not in ("P", "1"):
+                    image = image.reduce(factor)
+                    route = "reduce"
+        image.load()
+        if tracer.enabled:
+            span.args["route"] = route
+
+    with tracer.span("resize", size=f"{new_width}x{new_height}"):
+        resized = image.resize((new_width, new_height), resample, reducing_gap=reducing_gap)
+    decode_stats.record(f"{mode}:{route}", time.perf_counter() - start)
+    return resized
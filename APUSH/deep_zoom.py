@@ -0,0 +1,442 @@
+from collections import OrderedDict
+from pathlib import Path
+from PIL import Image, ImageTk
+import hashlib
+import io
+import json
+import math
+import os
+import struct
+import tkinter as tk
+import zlib
+from decode import fit_size
+from tracing import tracer
+
+
+#level 0 is never longer than this on either side. A larger JPEG is decoded through libjpeg's DCT scaling,
+#at most twice this size, and resized down; an 8-bit non-interlaced PNG is read a few rows at a time and
+#reduced by a whole factor, so its memory grows with the width only. Other formats (TIFF, WebP, 16-bit or
+#interlaced PNG) are still decoded in full before being resized.
+MAX_PYRAMID_SIDE = 4096
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+#bytes per pixel of each 8-bit PNG colour type: grey, RGB, palette, grey+alpha, RGBA
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+#rows of level 0 decoded at a time from a PNG; a divisor of the tile size keeps the stacking trivial
+PNG_BAND_ROWS = 64
+
+
+def png_chunk(chunk_type, data):
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+def stack_rows(pieces, rows):
+    #joins strips of the same width into bands of rows height; the last band may be shorter
+    buffer = []
+    height = 0
+    for piece in pieces:
+        top = 0
+        while top < piece.height:
+            take = min(rows - height, piece.height - top)
+            buffer.append(piece if take == piece.height else piece.crop((0, top, piece.width, top + take)))
+            height += take
+            top += take
+            if height == rows:
+                yield join_rows(buffer)
+                buffer, height = [], 0
+    if buffer:
+        yield join_rows(buffer)
+
+
+def join_rows(pieces):
+    if len(pieces) == 1:
+        return pieces[0]
+    joined = Image.new(pieces[0].mode, (pieces[0].width, sum(piece.height for piece in pieces)))
+    top = 0
+    for piece in pieces:
+        joined.paste(piece, (0, top))
+        top += piece.height
+    return joined
+
+
+class PngStrips:
+    #IDAT is inflated as a stream and each band is decoded by Pillow as a small PNG whose first row is the
+    #previous band's last row, unfiltered, so the Up, Average and Paeth filters still see the row above
+    def __init__(self, image_path, rows):
+        self.image_path = image_path
+        self.rows = rows
+        self.ancillary = b""
+        self.idat_offset = None
+        header = None
+        with open(image_path, "rb") as file:
+            if file.read(8) != PNG_SIGNATURE:
+                raise ValueError("not a PNG file")
+            while self.idat_offset is None:
+                head = file.read(8)
+                if len(head) < 8:
+                    raise ValueError("PNG has no image data")
+                length, chunk_type = struct.unpack(">I4s", head)
+                if chunk_type == b"IDAT":
+                    self.idat_offset = file.tell() - 8
+                elif chunk_type in (b"IHDR", b"PLTE", b"tRNS"):
+                    data = file.read(length)
+                    file.seek(4, os.SEEK_CUR)
+                    if chunk_type == b"IHDR":
+                        header = data
+                    else:
+                        self.ancillary += png_chunk(chunk_type, data)
+                else:
+                    file.seek(length + 4, os.SEEK_CUR)
+        if header is None:
+            raise ValueError("PNG has no header")
+        self.width, self.height, depth, self.color_type, _, _, interlace = struct.unpack(">IIBBBBB", header)
+        if depth != 8 or interlace or self.color_type not in PNG_CHANNELS:
+            raise ValueError("only 8-bit, non-interlaced PNGs can be read in bands")
+        self.row_bytes = 1 + self.width * PNG_CHANNELS[self.color_type]
+
+    def idat_data(self, file):
+        file.seek(self.idat_offset)
+        while True:
+            head = file.read(8)
+            if len(head) < 8:
+                raise ValueError("truncated PNG")
+            length, chunk_type = struct.unpack(">I4s", head)
+            if chunk_type != b"IDAT":
+                return
+            while length > 0:
+                data = file.read(min(length, 1024 * 1024))
+                if not data:
+                    raise ValueError("truncated PNG")
+                length -= len(data)
+                yield data
+            file.seek(4, os.SEEK_CUR)
+
+    def decode(self, band, previous):
+        if previous is not None:
+            band = b"\x00" + previous + band
+        rows = len(band) // self.row_bytes
+        header = struct.pack(">IIBBBBB", self.width, rows, 8, self.color_type, 0, 0, 0)
+        png = (
+            PNG_SIGNATURE + png_chunk(b"IHDR", header) + self.ancillary
+            + png_chunk(b"IDAT", zlib.compress(band, 0)) + png_chunk(b"IEND", b"")
+        )
+        image = Image.open(io.BytesIO(png))
+        image.load()
+        last_row = image.crop((0, rows - 1, self.width, rows)).tobytes()
+        if previous is not None:
+            image = image.crop((0, 1, self.width, rows))
+        return image, last_row
+
+    def __iter__(self):
+        band_bytes = self.rows * self.row_bytes
+        inflater = zlib.decompressobj()
+        pending = bytearray()
+        previous = None
+        remaining = self.height
+        with open(self.image_path, "rb") as file:
+            for data in self.idat_data(file):
+                while data and remaining > 0:
+                    pending += inflater.decompress(data, band_bytes)
+                    data = inflater.unconsumed_tail
+                    while remaining > 0 and len(pending) >= min(band_bytes, remaining * self.row_bytes):
+                        size = min(band_bytes, remaining * self.row_bytes)
+                        with memoryview(pending) as view:
+                            band = bytes(view[:size])
+                        del pending[:size]
+                        remaining -= size // self.row_bytes
+                        image, previous = self.decode(band, previous)
+                        yield image
+        if remaining > 0:
+            raise ValueError("truncated PNG")
+
+
+class TilePyramid:
+    #level 0 is full resolution up to max_side; each level above halves both sides until one tile covers the poster
+    def __init__(self, image_path, cache_root, tile_size=256, max_side=MAX_PYRAMID_SIDE):
+        self.image_path = Path(image_path)
+        self.tile_size = tile_size
+        self.max_side = max_side
+        stat = os.stat(image_path)
+        raw = f"{self.image_path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}|{tile_size}|{max_side}"
+        self.tile_dir = Path(cache_root) / hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        self.width = 0
+        self.height = 0
+        self.levels = 0
+        self.extension = ".jpg"
+
+    def meta_path(self):
+        return self.tile_dir / "pyramid.json"
+
+    def load_meta(self):
+        try:
+            with open(self.meta_path(), "r", encoding="utf-8") as file:
+                meta = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        self.width = meta["width"]
+        self.height = meta["height"]
+        self.levels = meta["levels"]
+        self.extension = meta["extension"]
+        return True
+
+    def level_zero_bands(self):
+        #bands of tile_size rows at level 0 resolution, plus the level 0 size
+        with Image.open(self.image_path) as image:
+            width, height = image.size
+            image_format = image.format
+            mode = image.mode
+            transparent = "transparency" in image.info
+        if mode not in ("RGB", "RGBA"):
+            mode = "RGBA" if "A" in mode or transparent else "RGB"
+        factor = max(math.ceil(max(width, height) / self.max_side), 1)
+        if image_format == "PNG":
+            try:
+                strips = PngStrips(self.image_path, PNG_BAND_ROWS * factor)
+            except ValueError:
+                strips = None
+            if strips is not None:
+                #a whole-factor reduce of strips a multiple of factor tall lines up with the tile rows exactly
+                size = (math.ceil(width / factor), math.ceil(height / factor))
+                pieces = (strip.convert(mode) if strip.mode != mode else strip for strip in strips)
+                if factor > 1:
+                    pieces = (piece.reduce(factor) for piece in pieces)
+                return size, mode, stack_rows(pieces, self.tile_size)
+
+        image = Image.open(self.image_path)
+        if image_format == "JPEG" and factor > 1:
+            #the smallest DCT scale still at least max_side, then an exact resize down to it
+            scale = self.max_side / max(width, height)
+            image.draft(image.mode, (math.ceil(width * scale), math.ceil(height * scale)))
+        image.load()
+        image = image.convert(mode) if image.mode != mode else image
+        if max(image.size) > self.max_side:
+            size = fit_size(width, height, self.max_side, self.max_side)
+            image = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+        size = image.size
+        bands = (
+            image.crop((0, top, size[0], min(top + self.tile_size, size[1])))
+            for top in range(0, size[1], self.tile_size)
+        )
+        return size, mode, bands
+
+    def build(self):
+        #runs on a worker thread; after this the viewer only ever reads tiles
+        if self.load_meta():
+            return self
+        with tracer.span("build tile pyramid", path=self.image_path):
+            (self.width, self.height), mode, bands = self.level_zero_bands()
+            self.extension = ".png" if mode == "RGBA" else ".jpg"
+            self.levels = max(math.ceil(math.log2(max(self.width, self.height) / self.tile_size)), 0) + 1
+
+            #each level keeps at most one half-height band waiting for its partner, so the build holds a
+            #band per level rather than a whole level
+            self.tile_dir.mkdir(parents=True, exist_ok=True)
+            waiting = [None] * self.levels
+            rows_written = [0] * self.levels
+            for band in bands:
+                self.push_band(0, band, waiting, rows_written)
+            for level in range(self.levels):
+                if waiting[level] is not None:
+                    band, waiting[level] = waiting[level], None
+                    self.write_band(level, band, waiting, rows_written)
+            with open(self.meta_path(), "w", encoding="utf-8") as file:
+                json.dump({
+                    "width": self.width,
+                    "height": self.height,
+                    "levels": self.levels,
+                    "extension": self.extension,
+                    "tile_size": self.tile_size,
+                }, file)
+        return self
+
+    def push_band(self, level, band, waiting, rows_written):
+        if band.height < self.tile_size and waiting[level] is None and level > 0:
+            waiting[level] = band
+            return
+        if waiting[level] is not None:
+            band = join_rows([waiting[level], band])
+            waiting[level] = None
+        self.write_band(level, band, waiting, rows_written)
+
+    def write_band(self, level, band, waiting, rows_written):
+        #one row of tiles, then the same band halved goes up to the next level
+        level_dir = self.tile_dir / str(level)
+        level_dir.mkdir(exist_ok=True)
+        row = rows_written[level]
+        rows_written[level] += 1
+        for col in range(math.ceil(band.width / self.tile_size)):
+            box = (col * self.tile_size, 0, min((col + 1) * self.tile_size, band.width), band.height)
+            band.crop(box).save(level_dir / f"{col}_{row}{self.extension}", quality=90)
+        if level + 1 < self.levels:
+            self.push_band(level + 1, band.reduce(2), waiting, rows_written)
+
+    def level_size(self, level):
+        scale = 2 ** level
+        return max(math.ceil(self.width / scale), 1), max(math.ceil(self.height / scale), 1)
+
+    def grid_size(self, level):
+        width, height = self.level_size(level)
+        return math.ceil(width / self.tile_size), math.ceil(height / self.tile_size)
+
+    def load_tile(self, level, col, row, display_width, display_height):
+        with tracer.span("decode tile", level=level):
+            tile = Image.open(self.tile_dir / str(level) / f"{col}_{row}{self.extension}")
+            tile.load()
+        if tile.size != (display_width, display_height):
+            tile = tile.resize((display_width, display_height), Image.BILINEAR)
+        return tile
+
+
+class ZoomCanvas(tk.Canvas):
+    def __init__(self, parent, loader, max_tiles=192, **kwargs):
+        super().__init__(parent, highlightthickness=0, **kwargs)
+        self.loader = loader
+        self.max_tiles = max_tiles
+        self.tiles = OrderedDict()
+        self.requested = {}
+        self.pyramid = None
+        self.scale = 1.0
+        self.min_scale = 1.0
+        self.view_x = 0.0
+        self.view_y = 0.0
+        self.drag_start = None
+        self.render_pending = False
+
+        self.bind("<Configure>", lambda e: self.schedule_render())
+        self.bind("<MouseWheel>", lambda e: self.zoom(1.25 if e.delta > 0 else 0.8, e.x, e.y))
+        self.bind("<Button-4>", lambda e: self.zoom(1.25, e.x, e.y))
+        self.bind("<Button-5>", lambda e: self.zoom(0.8, e.x, e.y))
+        self.bind("<ButtonPress-1>", self.on_press)
+        self.bind("<B1-Motion>", self.on_drag)
+        self.bind("<Double-Button-1>", lambda e: self.fit())
+
+    def set_pyramid(self, pyramid):
+        self.clear()
+        self.pyramid = pyramid
+        self.fit()
+
+    def clear(self):
+        for future in self.requested.values():
+            future.cancel()
+        self.requested.clear()
+        self.tiles.clear()
+        self.delete("all")
+        self.pyramid = None
+
+    def fit(self):
+        if self.pyramid is None:
+            return
+        view_width = max(self.winfo_width(), 1)
+        view_height = max(self.winfo_height(), 1)
+        self.min_scale = min(view_width / self.pyramid.width, view_height / self.pyramid.height, 1.0)
+        self.scale = self.min_scale
+        self.view_x = (self.pyramid.width * self.scale - view_width) / 2
+        self.view_y = (self.pyramid.height * self.scale - view_height) / 2
+        self.schedule_render()
+
+    def zoom(self, factor, x, y):
+        if self.pyramid is None:
+            return
+        new_scale = min(max(self.scale * factor, self.min_scale), 4.0)
+        #keep the source pixel under the cursor fixed while zooming
+        source_x = (self.view_x + x) / self.scale
+        source_y = (self.view_y + y) / self.scale
+        self.scale = new_scale
+        self.view_x = source_x * new_scale - x
+        self.view_y = source_y * new_scale - y
+        self.schedule_render()
+
+    def on_press(self, event):
+        self.drag_start = (event.x, event.y, self.view_x, self.view_y)
+
+    def on_drag(self, event):
+        if self.drag_start is None:
+            return
+        start_x, start_y, view_x, view_y = self.drag_start
+        self.view_x = view_x - (event.x - start_x)
+        self.view_y = view_y - (event.y - start_y)
+        self.schedule_render()
+
+    def clamp_view(self):
+        view_width = self.winfo_width()
+        view_height = self.winfo_height()
+        content_width = self.pyramid.width * self.scale
+        content_height = self.pyramid.height * self.scale
+        if content_width <= view_width:
+            self.view_x = (content_width - view_width) / 2
+        else:
+            self.view_x = min(max(self.view_x, 0), content_width - view_width)
+        if content_height <= view_height:
+            self.view_y = (content_height - view_height) / 2
+        else:
+            self.view_y = min(max(self.view_y, 0), content_height - view_height)
+
+    def schedule_render(self):
+        if not self.render_pending:
+            self.render_pending = True
+            self.after_idle(self.render)
+
+    def choose_level(self):
+        #the coarsest level that still has at least one source pixel per screen pixel
+        level = math.floor(math.log2(1 / self.scale)) if self.scale < 1 else 0
+        return min(max(level, 0), self.pyramid.levels - 1)
+
+    def render(self):
+        self.render_pending = False
+        if self.pyramid is None:
+            return
+        self.clamp_view()
+        level = self.choose_level()
+        tile_scale = self.scale * (2 ** level)
+        step = self.pyramid.tile_size * tile_scale
+        columns, rows = self.pyramid.grid_size(level)
+        level_width, level_height = self.pyramid.level_size(level)
+
+        first_col = max(int(self.view_x // step), 0)
+        first_row = max(int(self.view_y // step), 0)
+        last_col = min(int((self.view_x + self.winfo_width()) // step), columns - 1)
+        last_row = min(int((self.view_y + self.winfo_height()) // step), rows - 1)
+
+        self.delete("tile")
+        wanted = set()
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                left = round(col * step)
+                top = round(row * step)
+                tile_width = min(self.pyramid.tile_size, level_width - col * self.pyramid.tile_size)
+                tile_height = min(self.pyramid.tile_size, level_height - row * self.pyramid.tile_size)
+                right = round(col * step + tile_width * tile_scale)
+                bottom = round(row * step + tile_height * tile_scale)
+                key = (level, col, row, max(right - left, 1), max(bottom - top, 1))
+                wanted.add(key)
+                photo = self.tiles.get(key)
+                if photo is not None:
+                    self.tiles.move_to_end(key)
+                    self.create_image(left - self.view_x, top - self.view_y, image=photo, anchor="nw", tags="tile")
+                elif key not in self.requested:
+                    self.request_tile(key)
+
+        for key, future in list(self.requested.items()):
+            if key not in wanted:
+                future.cancel()
+                del self.requested[key]
+
+    def request_tile(self, key):
+        pyramid = self.pyramid
+        level, col, row, width, height = key
+
+        def on_loaded(tile):
+            self.requested.pop(key, None)
+            if self.pyramid is not pyramid:
+                return
+            self.tiles[key] = ImageTk.PhotoImage(tile)
+            while len(self.tiles) > self.max_tiles:
+                self.tiles.popitem(last=False)
+            self.schedule_render()
+
+        def on_error(error):
+            self.requested.pop(key, None)
+            print(f"Error loading zoom tile {key}: {error}")
+
+        self.requested[key] = self.loader.submit(
+            "screen", pyramid.load_tile, (level, col, row, width, height), on_loaded, on_error
+        )
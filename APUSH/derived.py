@@ -0,0 +1,53 @@
+from pathlib import Path
+import threading
+from common import load_json
+from decode import fit_size
+from path_resolver import file_signature
+
+
+class DerivedImages:
+    #the smaller copies jpg2json.py writes at ingest, looked up through its manifest so a thumbnail or detail
+    #view decodes a few hundred KB instead of the original scan; an entry only counts while the original's
+    #stat still matches what the ingest saw
+    def __init__(self, manifest_path, base_dir):
+        self.manifest_path = Path(manifest_path)
+        self.base_dir = Path(base_dir)
+        self.lock = threading.Lock()
+        self.manifest_signature = None
+        self.entries = {}
+
+    def refresh(self):
+        signature = file_signature(self.manifest_path)
+        with self.lock:
+            if signature == self.manifest_signature:
+                return
+            try:
+                manifest = load_json(self.manifest_path, {}) if signature is not None else {}
+            except ValueError as e:
+                print(f"Error reading ingest manifest {self.manifest_path}: {e}")
+                manifest = {}
+            self.entries, self.manifest_signature = manifest, signature
+
+    def source_for(self, image_path, max_width, max_height):
+        #the smallest derived image at least as large as the request once both are fitted to the poster's
+        #shape, so a portrait poster can use the detail copy for a wide, short box; the original otherwise
+        self.refresh()
+        entry = self.entries.get(Path(image_path).name)
+        if entry is None or file_signature(image_path) != (entry.get("mtime_ns"), entry.get("bytes")):
+            return image_path
+        width, height = entry.get("width"), entry.get("height")
+        if not width or not height:
+            return image_path
+        wanted_width, wanted_height = fit_size(width, height, max_width, max_height)
+        candidates = []
+        for size_name, box in entry.get("derived_sizes", {}).items():
+            derived_width, derived_height = fit_size(width, height, *box)
+            #older ingests upscaled small originals; those copies are never better than the original
+            if size_name in entry.get("derived", {}) and derived_width < width:
+                candidates.append((derived_width, derived_height, size_name))
+        for derived_width, derived_height, size_name in sorted(candidates):
+            if derived_width >= wanted_width and derived_height >= wanted_height:
+                derived_path = self.base_dir / entry["derived"][size_name]
+                if derived_path.is_file():
+                    return str(derived_path)
+        return image_path
@@ -0,0 +1,557 @@
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+from pathlib import Path
+from PIL import Image, ImageDraw, ImageFont
+import argparse
+import hashlib
+import json
+import os
+import re
+import textwrap
+import time
+from content import HISTORICAL_TEXT, RESULTS_TEXT, RESPONSE_FIGURES
+from decode import decode_resized, fit_size
+from common import BASE_DIR, load_json, write_json
+from path_resolver import PathResolver
+
+VARIANT_WIDTHS = (320, 640, 1280)
+SPRITE_CELL = (150, 100)
+SPRITE_COLUMNS = 20
+SPRITE_ROWS = 20
+GALLERY_PAGE_SIZE = 120
+RENDER_CHUNK = 64
+#A4 at 150 dpi
+HANDOUT_PAGE = (1240, 1754)
+HANDOUT_MARGIN = 110
+#bump whenever a template below changes so every page is rendered again once
+TEMPLATE_VERSION = 1
+
+STYLESHEET = """body { font-family: Arial, sans-serif; margin: 0; background: #f4f4f4; color: #222; }
+nav { background: #b22222; padding: 12px 20px; }
+nav a { color: white; font-weight: bold; margin-right: 20px; text-decoration: none; }
+main { max-width: 1200px; margin: 0 auto; padding: 20px; }
+h1 { font-size: 1.8em; }
+.gallery { display: grid; grid-template-columns: repeat(auto-fill, minmax(170px, 1fr)); gap: 12px; }
+.tile { display: block; background: white; border: 1px solid #ccc; padding: 8px; color: inherit; text-decoration: none; }
+.tile .title { font-weight: bold; margin-top: 6px; }
+.tile .info { font-size: 0.85em; color: #555; }
+.sprite { display: block; width: 150px; height: 100px; margin: 0 auto; background-repeat: no-repeat; }
+.detail { display: flex; flex-wrap: wrap; gap: 24px; }
+.detail figure { flex: 3 1 480px; margin: 0; }
+.detail figure img { width: 100%; height: auto; }
+.detail .text { flex: 2 1 320px; }
+.missing { display: flex; align-items: center; justify-content: center; background: #ddd; min-height: 200px; }
+.pager, .neighbours { display: flex; justify-content: space-between; margin: 20px 0; }
+.figures figure { margin: 20px 0; text-align: center; }
+.figures img { max-width: 100%; height: auto; }
+@media print { nav, .pager, .neighbours { display: none; } body { background: white; } }
+"""
+
+
+def source_key(path):
+    stat = os.stat(path)
+    raw = f"{Path(path).resolve()}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def digest_of(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def save_atomic(image, target, format="JPEG"):
+    if format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    temp_target = target.with_suffix(f".{os.getpid()}.tmp")
+    image.save(temp_target, format=format, quality=88)
+    os.replace(temp_target, target)
+
+
+def write_text_atomic(path, text):
+    temp_path = Path(path).with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temp_path, path)
+
+
+def build_variants(source, key, images_dir):
+    #runs in a worker process; one poster's responsive widths plus its sprite cell
+    images_dir = Path(images_dir)
+    with Image.open(source) as image:
+        width, height = image.size
+
+    variants = []
+    for target_width in sorted({min(variant_width, width) for variant_width in VARIANT_WIDTHS}):
+        target = images_dir / f"{key}-{target_width}.jpg"
+        if not target.exists():
+            save_atomic(decode_resized(source, target_width, height, "quality"), target)
+        variant_width, variant_height = fit_size(width, height, target_width, height)
+        variants.append([variant_width, variant_height, target.name])
+
+    thumbnail = images_dir / f"{key}-thumb.jpg"
+    if not thumbnail.exists():
+        save_atomic(decode_resized(source, *SPRITE_CELL, "quality"), thumbnail)
+    return {"width": width, "height": height, "variants": variants, "thumbnail": thumbnail.name}
+
+
+def build_sprite_sheet(images_dir, name, thumbnails):
+    images_dir = Path(images_dir)
+    cell_width, cell_height = SPRITE_CELL
+    rows = (len(thumbnails) + SPRITE_COLUMNS - 1) // SPRITE_COLUMNS
+    sheet = Image.new("RGB", (cell_width * SPRITE_COLUMNS, cell_height * max(rows, 1)), "white")
+    for cell, thumbnail in enumerate(thumbnails):
+        if thumbnail is None:
+            continue
+        with Image.open(images_dir / thumbnail) as image:
+            left = (cell % SPRITE_COLUMNS) * cell_width + (cell_width - image.width) // 2
+            top = (cell // SPRITE_COLUMNS) * cell_height + (cell_height - image.height) // 2
+            sheet.paste(image, (left, top))
+    save_atomic(sheet, images_dir / name)
+    return name
+
+
+def gallery_page_name(page):
+    return "index.html" if page == 0 else f"gallery-{page + 1}.html"
+
+
+def poster_page_name(poster_id):
+    return f"poster-{poster_id}.html"
+
+
+def text_html(text):
+    paragraphs = re.split(r"\n\s*\n", textwrap.dedent(text).strip())
+    return "\n".join(
+        "<p>" + "<br>\n".join(escape(line.strip()) for line in paragraph.splitlines()) + "</p>"
+        for paragraph in paragraphs if paragraph.strip()
+    )
+
+
+def image_html(image, alt, sizes):
+    if image is None:
+        return '<div class="missing">Image not found</div>'
+    variants = image["variants"]
+    srcset = ", ".join(f"images/{name} {width}w" for width, height, name in variants)
+    width, height, name = variants[len(variants) // 2]
+    return (
+        f'<img src="images/{name}" srcset="{srcset}" sizes="{sizes}" '
+        f'width="{width}" height="{height}" alt="{escape(alt)}" loading="lazy">'
+    )
+
+
+def page_html(title, body):
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{escape(title)}</title>
+<link rel="stylesheet" href="style.css">
+</head>
+<body>
+<nav><a href="index.html">Poster Gallery</a><a href="context.html">Historical Context</a></nav>
+<main>
+{body}
+</main>
+</body>
+</html>
+"""
+
+
+def render_gallery(spec):
+    tiles = []
+    for tile in spec["tiles"]:
+        if tile["sprite"]:
+            sheet, x, y = tile["sprite"]
+            thumbnail = f'<span class="sprite" style="background-image: url(images/{sheet}); background-position: -{x}px -{y}px"></span>'
+        else:
+            thumbnail = '<span class="sprite missing">No image</span>'
+        tiles.append(
+            f'<a class="tile" href="{poster_page_name(tile["id"])}">{thumbnail}'
+            f'<div class="title">{escape(tile["title"])}</div>'
+            f'<div class="info">{escape(str(tile["designer"]))}, {escape(str(tile["year"]))}</div></a>'
+        )
+
+    page, pages = spec["page"], spec["pages"]
+    previous_link = f'<a href="{gallery_page_name(page - 1)}">&larr; Previous</a>' if page > 0 else "<span></span>"
+    next_link = f'<a href="{gallery_page_name(page + 1)}">Next &rarr;</a>' if page + 1 < pages else "<span></span>"
+    body = (
+        "<h1>Cold War Propaganda Posters</h1>\n"
+        f'<div class="gallery">\n' + "\n".join(tiles) + "\n</div>\n"
+        f'<div class="pager">{previous_link}<span>Page {page + 1} of {pages}</span>{next_link}</div>'
+    )
+    return page_html("Poster Gallery", body)
+
+
+def render_poster(spec):
+    poster = spec["poster"]
+    neighbours = []
+    for label, neighbour in (("&larr; Previous", spec["previous"]), ("Next &rarr;", spec["next"])):
+        if neighbour is None:
+            neighbours.append("<span></span>")
+        else:
+            neighbours.append(f'<a href="{poster_page_name(neighbour[0])}">{label}: {escape(neighbour[1])}</a>')
+    body = (
+        f"<h1>{escape(poster['title'])}</h1>\n"
+        '<div class="detail">\n'
+        f"<figure>{image_html(spec['image'], poster['title'], '(max-width: 900px) 100vw, 60vw')}</figure>\n"
+        '<div class="text">\n'
+        f"<p><strong>Designer:</strong> {escape(str(poster['designer']))}</p>\n"
+        f"<p><strong>Year:</strong> {escape(str(poster['year']))}</p>\n"
+        f"<h2>Historical Analysis</h2>\n{text_html(poster['explanation'])}\n"
+        "</div>\n</div>\n"
+        f'<div class="neighbours">{neighbours[0]}<a href="{spec["gallery_page"]}">Back to Gallery</a>{neighbours[1]}</div>'
+    )
+    return page_html(poster["title"], body)
+
+
+def render_context(spec):
+    figures = "\n".join(
+        f"<figure>{image_html(image, caption, '(max-width: 900px) 100vw, 350px')}<figcaption>{escape(caption)}</figcaption></figure>"
+        for image, caption in spec["figures"]
+    )
+    body = (
+        "<h1>Historical Context: Cold War Propaganda</h1>\n"
+        '<div class="detail">\n'
+        f'<div class="text" style="flex: 3 1 480px">\n{text_html(spec["historical"])}\n{text_html(spec["results"])}\n</div>\n'
+        f'<div class="figures" style="flex: 1 1 300px">\n{figures}\n</div>\n'
+        "</div>"
+    )
+    return page_html("Historical Context", body)
+
+
+RENDERERS = {
+    "gallery": render_gallery,
+    "poster": render_poster,
+    "context": render_context,
+}
+
+
+def render_chunk(out_dir, items):
+    #runs in a worker process and writes its pages directly so only names travel back
+    written = []
+    for name, spec in items:
+        write_text_atomic(Path(out_dir) / name, RENDERERS[spec["kind"]](spec))
+        written.append(name)
+    return written
+
+
+def load_font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except (TypeError, AttributeError, ImportError):
+        #Pillow before 10.1, or built without FreeType
+        return ImageFont.load_default()
+
+
+def wrap_lines(text, font, width):
+    average = font.getlength("abcdefghijklmnopqrstuvwxyz") / 26 or 1
+    columns = max(int(width / average), 20)
+    lines = []
+    for paragraph in re.split(r"\n\s*\n", textwrap.dedent(text).strip()):
+        for line in paragraph.splitlines():
+            lines.extend(textwrap.wrap(line.strip(), columns) or [""])
+        lines.append("")
+    return lines
+
+
+def render_handout(spec, images_dir, pages_dir, prefix):
+    #one spec can spill over several A4 pages; each is saved so the PDF can be reassembled without re-rendering
+    page_width, page_height = HANDOUT_PAGE
+    text_width = page_width - 2 * HANDOUT_MARGIN
+    title_font = load_font(44)
+    body_font = load_font(26)
+    line_height = 38
+
+    if spec["kind"] == "context":
+        title = "Historical Context: Cold War Propaganda"
+        text = spec["historical"] + "\n\n" + spec["results"]
+        image = None
+    else:
+        poster = spec["poster"]
+        title = poster["title"]
+        text = f"Designer: {poster['designer']}\nYear: {poster['year']}\n\n{poster['explanation']}"
+        image = spec["image"]
+
+    pages = []
+    page = Image.new("RGB", HANDOUT_PAGE, "white")
+    draw = ImageDraw.Draw(page)
+    draw.text((HANDOUT_MARGIN, HANDOUT_MARGIN), title, fill="black", font=title_font)
+    y = HANDOUT_MARGIN + 80
+
+    if image is not None:
+        largest = Path(images_dir) / image["variants"][-1][2]
+        picture = decode_resized(largest, text_width, page_height // 2, "quality")
+        page.paste(picture.convert("RGB"), (HANDOUT_MARGIN + (text_width - picture.width) // 2, y))
+        y += picture.height + 40
+
+    for line in wrap_lines(text, body_font, text_width):
+        if y + line_height > page_height - HANDOUT_MARGIN:
+            pages.append(page)
+            page = Image.new("RGB", HANDOUT_PAGE, "white")
+            draw = ImageDraw.Draw(page)
+            y = HANDOUT_MARGIN
+        draw.text((HANDOUT_MARGIN, y), line, fill="black", font=body_font)
+        y += line_height
+    pages.append(page)
+
+    names = []
+    for number, page in enumerate(pages):
+        name = f"{prefix}-{number}.png"
+        save_atomic(page, Path(pages_dir) / name, "PNG")
+        names.append(name)
+    return names
+
+
+class StaticExporter:
+    def __init__(self, json_path, out_dir, posters_dir, workers=None, force=False):
+        self.json_path = Path(json_path)
+        self.out_dir = Path(out_dir)
+        self.images_dir = self.out_dir / "images"
+        self.pages_dir = self.out_dir / "handout-pages"
+        self.posters_dir = Path(posters_dir)
+        self.resolver = PathResolver(BASE_DIR, self.posters_dir)
+        self.workers = workers
+        self.manifest_path = self.out_dir / "manifest.json"
+        self.previous = {} if force else load_json(self.manifest_path, {})
+        self.manifest = {"images": {}, "sprites": {}, "pages": {}, "handout": {}}
+        self.counts = {"images": 0, "sprites": 0, "pages": 0, "handout": 0}
+        self.keys = {}
+
+    def run(self, pdf=False):
+        self.images_dir.mkdir(parents=True, exist_ok=True)
+        posters = load_json(self.json_path, [])
+        sources = {}
+        for poster in posters:
+            source = self.resolver.resolve(poster.get("image_path"))
+            if source is None:
+                print(f"Warning: no image found for poster {poster['id']} ({poster.get('image_path')})")
+            sources[poster["id"]] = source
+        figure_sources = [self.posters_dir / name for name, caption in RESPONSE_FIGURES]
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            images = self.build_images(executor, [*sources.values(), *figure_sources])
+            sprites = self.build_sprites(executor, posters, sources, images)
+            specs = self.page_specs(posters, sources, images, sprites)
+            self.render_pages(executor, specs)
+            if pdf:
+                self.build_handout(executor, specs)
+            else:
+                #handout.pdf stays as the last --pdf run left it, so its pages stay with it for the next one
+                self.manifest["handout"] = self.previous.get("handout", {})
+                if "pdf" in self.previous:
+                    self.manifest["pdf"] = self.previous["pdf"]
+
+        stylesheet = self.out_dir / "style.css"
+        if not stylesheet.exists() or stylesheet.read_text(encoding="utf-8") != STYLESHEET:
+            write_text_atomic(stylesheet, STYLESHEET)
+        self.prune()
+        write_json(self.manifest_path, self.manifest)
+        return self.counts
+
+    def build_images(self, executor, sources):
+        previous = self.previous.get("images", {})
+        images = {}
+        futures = {}
+        for source in sources:
+            if source is None or not Path(source).exists():
+                continue
+            key = self.keys[str(source)] = source_key(source)
+            if key in images or key in futures:
+                continue
+            entry = previous.get(key)
+            names = [variant[2] for variant in entry["variants"]] + [entry["thumbnail"]] if entry else []
+            if entry and all((self.images_dir / name).exists() for name in names):
+                images[key] = entry
+            else:
+                futures[key] = (source, executor.submit(build_variants, str(source), key, str(self.images_dir)))
+
+        for key, (source, future) in futures.items():
+            try:
+                images[key] = future.result()
+                self.counts["images"] += 1
+            except Exception as e:
+                print(f"Error exporting image {source}: {e}")
+        self.manifest["images"] = images
+        return images
+
+    def image_for(self, source, images):
+        if source is None:
+            return None
+        return images.get(self.keys.get(str(source)))
+
+    def build_sprites(self, executor, posters, sources, images):
+        #one sheet per SPRITE_COLUMNS x SPRITE_ROWS posters, named by content so browsers cache them forever
+        per_sheet = SPRITE_COLUMNS * SPRITE_ROWS
+        previous = self.previous.get("sprites", {})
+        positions = {}
+        futures = []
+        for start in range(0, len(posters), per_sheet):
+            thumbnails = []
+            for poster in posters[start:start + per_sheet]:
+                image = self.image_for(sources[poster["id"]], images)
+                thumbnails.append(image["thumbnail"] if image else None)
+            name = f"sprite-{digest_of(thumbnails)[:16]}.jpg"
+            self.manifest["sprites"][name] = thumbnails
+            if name not in previous or not (self.images_dir / name).exists():
+                futures.append(executor.submit(build_sprite_sheet, str(self.images_dir), name, thumbnails))
+            for cell, poster in enumerate(posters[start:start + per_sheet]):
+                if thumbnails[cell] is not None:
+                    x = (cell % SPRITE_COLUMNS) * SPRITE_CELL[0]
+                    y = (cell // SPRITE_COLUMNS) * SPRITE_CELL[1]
+                    positions[poster["id"]] = [name, x, y]
+
+        for future in futures:
+            try:
+                future.result()
+                self.counts["sprites"] += 1
+            except Exception as e:
+                print(f"Error building sprite sheet: {e}")
+        return positions
+
+    def page_specs(self, posters, sources, images, sprites):
+        specs = {}
+        pages = max((len(posters) + GALLERY_PAGE_SIZE - 1) // GALLERY_PAGE_SIZE, 1)
+        for page in range(pages):
+            specs[gallery_page_name(page)] = {
+                "kind": "gallery",
+                "page": page,
+                "pages": pages,
+                "tiles": [
+                    {
+                        "id": poster["id"],
+                        "title": poster.get("title", ""),
+                        "designer": poster.get("designer", "Unknown"),
+                        "year": poster.get("year"),
+                        "sprite": sprites.get(poster["id"]),
+                    }
+                    for poster in posters[page * GALLERY_PAGE_SIZE:(page + 1) * GALLERY_PAGE_SIZE]
+                ],
+            }
+
+        for index, poster in enumerate(posters):
+            previous = posters[index - 1] if index > 0 else None
+            following = posters[index + 1] if index + 1 < len(posters) else None
+            specs[poster_page_name(poster["id"])] = {
+                "kind": "poster",
+                "poster": {
+                    "title": poster.get("title", ""),
+                    "designer": poster.get("designer", "Unknown"),
+                    "year": poster.get("year"),
+                    "explanation": poster.get("explanation", ""),
+                },
+                "image": self.image_for(sources[poster["id"]], images),
+                "previous": [previous["id"], previous.get("title", "")] if previous else None,
+                "next": [following["id"], following.get("title", "")] if following else None,
+                "gallery_page": gallery_page_name(index // GALLERY_PAGE_SIZE),
+            }
+
+        specs["context.html"] = {
+            "kind": "context",
+            "historical": HISTORICAL_TEXT,
+            "results": RESULTS_TEXT,
+            "figures": [
+                [self.image_for(self.posters_dir / name, images), caption]
+                for name, caption in RESPONSE_FIGURES
+            ],
+        }
+        return specs
+
+    def render_pages(self, executor, specs):
+        #a page is re-rendered only when its inputs changed, so editing one poster touches its own page,
+        #its neighbours' prev/next links and the gallery page it sits on
+        previous = self.previous.get("pages", {})
+        stale = []
+        for name, spec in specs.items():
+            digest = digest_of([TEMPLATE_VERSION, spec])
+            self.manifest["pages"][name] = digest
+            if previous.get(name) != digest or not (self.out_dir / name).exists():
+                stale.append((name, spec))
+
+        chunks = [stale[start:start + RENDER_CHUNK] for start in range(0, len(stale), RENDER_CHUNK)]
+        futures = [executor.submit(render_chunk, str(self.out_dir), chunk) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                self.counts["pages"] += len(future.result())
+            except Exception as e:
+                print(f"Error rendering pages {chunk[0][0]}..{chunk[-1][0]}: {e}")
+                for name, spec in chunk:
+                    self.manifest["pages"].pop(name, None)
+
+    def build_handout(self, executor, specs):
+        self.pages_dir.mkdir(exist_ok=True)
+        previous = self.previous.get("handout", {})
+        order = ["context.html"] + [name for name, spec in specs.items() if spec["kind"] == "poster"]
+        futures = {}
+        for name in order:
+            #prev/next links and the gallery page do not appear on paper
+            printed = {key: value for key, value in specs[name].items() if key not in ("previous", "next", "gallery_page")}
+            digest = digest_of([TEMPLATE_VERSION, printed])
+            entry = previous.get(name)
+            if entry and entry["digest"] == digest and all((self.pages_dir / page).exists() for page in entry["pages"]):
+                self.manifest["handout"][name] = entry
+            else:
+                futures[name] = (digest, executor.submit(
+                    render_handout, specs[name], str(self.images_dir), str(self.pages_dir), digest[:16]
+                ))
+
+        for name, (digest, future) in futures.items():
+            try:
+                self.manifest["handout"][name] = {"digest": digest, "pages": future.result()}
+                self.counts["handout"] += 1
+            except Exception as e:
+                print(f"Error rendering handout page for {name}: {e}")
+
+        page_names = [page for name in order if name in self.manifest["handout"] for page in self.manifest["handout"][name]["pages"]]
+        pdf_path = self.out_dir / "handout.pdf"
+        self.manifest["pdf"] = digest_of(page_names)
+        if not page_names or (self.previous.get("pdf") == self.manifest["pdf"] and pdf_path.exists()):
+            return
+        pages = [Image.open(self.pages_dir / page) for page in page_names]
+        try:
+            temp_path = pdf_path.with_suffix(".tmp")
+            pages[0].save(temp_path, format="PDF", save_all=True, append_images=pages[1:], resolution=150)
+            os.replace(temp_path, pdf_path)
+        finally:
+            for page in pages:
+                page.close()
+
+    def prune(self):
+        #anything the previous export wrote that the current catalog no longer references
+        for name in set(self.previous.get("pages", {})) - set(self.manifest["pages"]):
+            (self.out_dir / name).unlink(missing_ok=True)
+
+        keep = set(self.manifest["sprites"])
+        for entry in self.manifest["images"].values():
+            keep.update(variant[2] for variant in entry["variants"])
+            keep.add(entry["thumbnail"])
+        for path in self.images_dir.iterdir():
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
+
+        if self.pages_dir.exists():
+            keep = {page for entry in self.manifest["handout"].values() for page in entry["pages"]}
+            for path in self.pages_dir.iterdir():
+                if path.name not in keep:
+                    path.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the poster analysis as a static HTML site.")
+    parser.add_argument("--json", default=BASE_DIR / "data" / "posters.json", type=Path)
+    parser.add_argument("--posters-dir", default=BASE_DIR / "posters", type=Path)
+    parser.add_argument("--out", default=BASE_DIR / "export", type=Path)
+    parser.add_argument("--workers", default=None, type=int)
+    parser.add_argument("--pdf", action="store_true", help="also write handout.pdf")
+    parser.add_argument("--force", action="store_true", help="ignore the previous export and rebuild everything")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = StaticExporter(args.json, args.out, args.posters_dir, args.workers, args.force).run(pdf=args.pdf)
+    print(
+        f"Exported to {args.out} in {time.perf_counter() - start:.2f}s: "
+        f"{counts['images']} images, {counts['sprites']} sprite sheets, "
+        f"{counts['pages']} pages and {counts['handout']} handout entries regenerated"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import tkinter as tk
+from tkinter import ttk
+import math
+from tracing import tracer
+
+
+class GalleryTile:
+    def __init__(self, gallery):
+        self.gallery = gallery
+        self.index = None
+        self.poster = None
+        self.future = None
+
+        self.frame = tk.Frame(
+            gallery.canvas,
+            bd=2,
+            relief="ridge",
+            bg="white",
+            padx=5,
+            pady=5
+        )
+        self.frame.pack_propagate(False)
+
+        self.title_label = tk.Label(
+            self.frame,
+            font=("Arial", 10, "bold"),
+            bg="white"
+        )
+        self.title_label.pack(pady=5)
+
+        self.info_label = tk.Label(
+            self.frame,
+            font=("Arial", 8),
+            bg="white"
+        )
+        self.info_label.pack()
+
+        self.image_label = tk.Label(
+            self.frame,
+            bg="white"
+        )
+        self.image_label.pack(pady=5)
+
+        self.window = gallery.canvas.create_window(0, 0, window=self.frame, anchor="nw", state="hidden")
+
+        for widget in (self.frame, self.title_label, self.info_label, self.image_label):
+            widget.bind("<Button-1>", self.on_click)
+            gallery.bind_scroll_wheel(widget)
+
+    def on_click(self, event):
+        if self.poster is not None:
+            self.gallery.on_select(self.poster)
+
+    def bind_poster(self, index, poster):
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+        self.index = index
+        self.poster = poster
+        self.title_label.config(text=poster.title)
+        self.info_label.config(text=f"{poster.designer}, {poster.year if poster.year is not None else 'N/A'}")
+        if poster.image_path:
+            self.image_label.config(text="", width=0, height=0, relief="flat", bg="white")
+            self.future = self.gallery.load_image(self, poster)
+        else:
+            self.image_label.config(
+                image="",
+                text="No Image",
+                width=15,
+                height=8,
+                bg="#e0e0e0",
+                relief="sunken"
+            )
+
+    def unbind_poster(self):
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+        self.index = None
+        self.poster = None
+
+    def is_showing(self, poster):
+        return self.poster is poster
+
+
+class VirtualGallery(tk.Frame):
+    #only the tiles in or near the viewport exist; they are recycled as the user scrolls
+    def __init__(self, parent, on_select, load_image, columns=6, tile_height=190, overscan_rows=1,
+                 thumbnail_size=(150, 100), **kwargs):
+        super().__init__(parent, **kwargs)
+        self.on_select = on_select
+        self.load_image = load_image
+        self.columns = columns
+        self.tile_height = tile_height
+        self.overscan_rows = overscan_rows
+        self.thumbnail_size = thumbnail_size
+        self.items = []
+        self.tiles = []
+        self.tile_width = 0
+        #called once when the view comes within a pool of tiles of the last item, to fetch the rest of a partial list
+        self.on_near_end = None
+
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_view_changed)
+
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.bind_scroll_wheel(self.canvas)
+
+    def bind_scroll_wheel(self, widget):
+        widget.bind("<MouseWheel>", self.on_mouse_wheel)
+        widget.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        widget.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+
+    def on_mouse_wheel(self, event):
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+
+    def set_items(self, items):
+        self.items = items
+        self.on_near_end = None
+        for tile in self.tiles:
+            tile.unbind_poster()
+            self.canvas.itemconfigure(tile.window, state="hidden")
+        self.update_scrollregion()
+        self.canvas.yview_moveto(0)
+        self.refresh()
+
+    def replace_items(self, items):
+        #keeps the scroll position; tiles whose poster object is unchanged are not rebound
+        self.items = items
+        self.update_scrollregion()
+        self.refresh()
+
+    def row_count(self):
+        return math.ceil(len(self.items) / self.columns)
+
+    def update_scrollregion(self):
+        width = max(self.canvas.winfo_width(), 1)
+        height = max(self.row_count() * self.tile_height, self.canvas.winfo_height())
+        self.canvas.configure(
+            scrollregion=(0, 0, width, height),
+            yscrollincrement=self.tile_height // 4
+        )
+
+    def set_layout(self, columns, tile_height, thumbnail_size):
+        if (columns, tile_height, thumbnail_size) == (self.columns, self.tile_height, self.thumbnail_size):
+            return
+        #keep the first visible poster in view across a column change
+        first_index = int(self.canvas.canvasy(0) // self.tile_height) * self.columns
+        new_thumbnails = thumbnail_size != self.thumbnail_size
+        self.columns = columns
+        self.tile_height = tile_height
+        self.thumbnail_size = thumbnail_size
+        self.relayout(self.canvas.winfo_width(), self.canvas.winfo_height())
+        total_height = max(self.row_count() * self.tile_height, 1)
+        self.canvas.yview_moveto((first_index // self.columns) * self.tile_height / total_height)
+        self.refresh(force=new_thumbnails)
+
+    def on_resize(self, event):
+        self.relayout(event.width, event.height)
+        self.refresh()
+
+    def relayout(self, width, height):
+        self.tile_width = max(width // self.columns, 1)
+        visible_rows = math.ceil(height / self.tile_height) + 1
+        pool_size = (visible_rows + 2 * self.overscan_rows) * self.columns
+        with tracer.span("create gallery tiles", count=max(pool_size - len(self.tiles), 0)):
+            while len(self.tiles) < pool_size:
+                self.tiles.append(GalleryTile(self))
+        for tile in self.tiles:
+            self.canvas.itemconfigure(
+                tile.window,
+                width=self.tile_width - 10,
+                height=self.tile_height - 10
+            )
+        self.update_scrollregion()
+
+    def on_view_changed(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def visible_range(self):
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first_row = max(int(top // self.tile_height) - self.overscan_rows, 0)
+        last_row = min(int(bottom // self.tile_height) + self.overscan_rows, self.row_count() - 1)
+        return first_row * self.columns, min((last_row + 1) * self.columns, len(self.items))
+
+    def refresh(self, force=False):
+        if not self.tiles:
+            return
+        with tracer.span("gallery refresh"):
+            self.refresh_tiles(force)
+
+    def refresh_tiles(self, force):
+        start, end = self.visible_range()
+        pool_size = len(self.tiles)
+        #a contiguous run no longer than the pool maps onto distinct tiles through index % pool_size
+        shown = set()
+        for index in range(start, end):
+            tile = self.tiles[index % pool_size]
+            shown.add(id(tile))
+            if force or tile.index != index or tile.poster is not self.items[index]:
+                tile.bind_poster(index, self.items[index])
+            row, col = divmod(index, self.columns)
+            self.canvas.coords(tile.window, col * self.tile_width + 5, row * self.tile_height + 5)
+            self.canvas.itemconfigure(tile.window, state="normal")
+        for tile in self.tiles:
+            if id(tile) not in shown and tile.index is not None:
+                tile.unbind_poster()
+                self.canvas.itemconfigure(tile.window, state="hidden")
+        if self.on_near_end is not None and end + pool_size >= len(self.items):
+            on_near_end, self.on_near_end = self.on_near_end, None
+            on_near_end()
+
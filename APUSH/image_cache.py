@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from PIL import Image
+import threading
+
+
+class ImageCache:
+    def __init__(self, max_bytes=128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, image_path, max_width, max_height):
+        return (str(image_path), max_width, max_height)
+
+    def estimate_bytes(self, pil_image):
+        #the resized PIL copy plus Tk's own 32-bit copy inside the PhotoImage
+        width, height = pil_image.size
+        return width * height * (len(pil_image.getbands()) + 4)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, pil_image, photo_image):
+        #pil_image is None when the pixels only exist inside Tk, as with the process decode backend
+        if pil_image is None:
+            nbytes = photo_image.width() * photo_image.height() * 4
+        else:
+            nbytes = self.estimate_bytes(pil_image)
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)[2]
+        if nbytes > self.max_bytes:
+            return
+        self.entries[key] = (pil_image, photo_image, nbytes)
+        self.total_bytes += nbytes
+        while self.total_bytes > self.max_bytes:
+            _, (_, _, evicted_bytes) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_bytes
+
+    def discard_path(self, image_path):
+        #every size cached for one file, e.g. after the catalog stops pointing at it
+        path = str(image_path)
+        for key in [key for key in self.entries if key[0] == path]:
+            self.total_bytes -= self.entries.pop(key)[2]
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class DecodedAssetCache:
+    #full-size decoded images for app assets (icon, decorations), each file decoded exactly once
+    def __init__(self):
+        self.images = {}
+        self.lock = threading.Lock()
+
+    def get(self, image_path):
+        key = str(image_path)
+        with self.lock:
+            image = self.images.get(key)
+            if image is None:
+                image = Image.open(image_path)
+                image.load()
+                self.images[key] = image
+            return image
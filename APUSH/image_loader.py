@@ -0,0 +1,137 @@
+from concurrent.futures import ThreadPoolExecutor
+import queue
+from process_decoder import to_photo
+
+
+class AsyncImageLoader:
+    #decodes on a thread pool; callbacks always run on the Tk thread via root.after polling
+    def __init__(self, root, max_workers=4, poll_ms=15):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-loader")
+        self.results = queue.Queue()
+        self.pending = {}
+        self.generations = {}
+        self.poll_id = None
+
+    def submit(self, group, func, args, callback, on_error=None):
+        generation = self.generations.setdefault(group, 0)
+        future = self.executor.submit(func, *args)
+        self.pending.setdefault(group, set()).add(future)
+        future.add_done_callback(
+            lambda f: self.results.put((group, generation, f, callback, on_error))
+        )
+        if self.poll_id is None:
+            self.poll_id = self.root.after(self.poll_ms, self.drain)
+        return future
+
+    def cancel(self, group):
+        #bumping the generation drops anything already finished but not yet delivered
+        self.generations[group] = self.generations.get(group, 0) + 1
+        for future in self.pending.pop(group, ()):
+            future.cancel()
+
+    def cancel_all(self):
+        for group in list(self.pending):
+            self.cancel(group)
+
+    def drain(self):
+        self.poll_id = None
+        while True:
+            try:
+                group, generation, future, callback, on_error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            futures = self.pending.get(group)
+            if futures is not None:
+                futures.discard(future)
+            if future.cancelled() or generation != self.generations.get(group):
+                continue
+            #a raising callback is reported and skipped, so the rest of the queue and the next poll still run
+            try:
+                error = future.exception()
+                if error is None:
+                    callback(future.result())
+                elif on_error is not None:
+                    on_error(error)
+                else:
+                    print(f"Error in background image job: {error}")
+            except Exception as e:
+                print(f"Error in background image callback: {e}")
+        if any(self.pending.values()):
+            self.poll_id = self.root.after(self.poll_ms, self.drain)
+
+    def shutdown(self):
+        self.cancel_all()
+        if self.poll_id is not None:
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class NeighborPrefetcher:
+    #prepares display-sized images for the posters around the one being shown
+    def __init__(self, root, loader, image_cache, resize, window=1, delay_ms=150):
+        self.root = root
+        self.loader = loader
+        self.image_cache = image_cache
+        self.resize = resize
+        self.window = window
+        self.delay_ms = delay_ms
+        self.in_flight = {}
+        self.wanted = set()
+        self.after_id = None
+
+    def schedule(self, index, count, path_at, max_width, max_height):
+        #restart the settle timer on every call so holding an arrow key only prefetches where the user stops
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+        self.after_id = self.root.after(
+            self.delay_ms, self.start, index, count, path_at, max_width, max_height
+        )
+
+    def start(self, index, count, path_at, max_width, max_height):
+        self.after_id = None
+        order = []
+        for distance in range(1, self.window + 1):
+            for neighbour in (index + distance, index - distance):
+                if 0 <= neighbour < count:
+                    image_path = path_at(neighbour)
+                    if image_path:
+                        order.append(self.image_cache.make_key(image_path, max_width, max_height))
+        self.wanted = set(order)
+
+        for key, future in list(self.in_flight.items()):
+            if key not in self.wanted:
+                future.cancel()
+                del self.in_flight[key]
+
+        for key in order:
+            if key in self.image_cache or key in self.in_flight:
+                continue
+            self.in_flight[key] = self.loader.submit(
+                "prefetch",
+                self.resize,
+                key,
+                lambda image, key=key: self.on_ready(key, image),
+                lambda error, key=key: self.on_failed(key, error)
+            )
+
+    def on_ready(self, key, image):
+        self.in_flight.pop(key, None)
+        if key not in self.wanted:
+            return
+        self.image_cache.put(key, *to_photo(image))
+
+    def on_failed(self, key, error):
+        self.in_flight.pop(key, None)
+        print(f"Error prefetching image {key[0]}: {error}")
+
+    def cancel(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.wanted = set()
+        for future in self.in_flight.values():
+            future.cancel()
+        self.in_flight.clear()
@@ -1,2 +1,196 @@
-import tkinter.font
-print(tkinter.font.families())
\ No newline at end of file
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from PIL import Image
+import argparse
+import os
+import time
+from common import BASE_DIR, file_sha256, load_json, write_json
+from decode import decode_resized, fit_size
+from path_resolver import IMAGE_EXTENSIONS, poster_file_name
+import similarity
+
+#read back through the manifest by derived.py, so the app decodes these instead of the originals
+DERIVED_SIZES = {
+    "thumbnail": (150, 100),
+    "gallery": (300, 200),
+    "detail": (1152, 648),
+}
+DERIVED_FORMATS = {
+    "jpeg": ("JPEG", ".jpg"),
+    "png": ("PNG", ".png"),
+    "webp": ("WEBP", ".webp"),
+}
+
+
+def relative_to_base(path):
+    try:
+        return Path(path).resolve().relative_to(BASE_DIR).as_posix()
+    except ValueError:
+        return Path(path).resolve().as_posix()
+
+
+def ingest_file(image_path, derived_dir, derived_format):
+    #runs in a worker process, so it only takes and returns plain picklable values
+    image_path = Path(image_path)
+    stat = image_path.stat()
+    sha256 = file_sha256(image_path)
+    with Image.open(image_path) as image:
+        width, height = image.size
+        image_format = image.format
+
+    save_format, extension = DERIVED_FORMATS[derived_format]
+    derived = {}
+    for size_name, (max_width, max_height) in DERIVED_SIZES.items():
+        #a copy no smaller than the original would only be a blurrier, recompressed original
+        if fit_size(width, height, max_width, max_height)[0] >= width:
+            continue
+        target = Path(derived_dir) / sha256[:2] / f"{sha256}_{size_name}{extension}"
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            resized = decode_resized(image_path, max_width, max_height, "quality")
+            if save_format == "JPEG" and resized.mode not in ("RGB", "L"):
+                resized = resized.convert("RGB")
+            temp_target = target.with_suffix(f".{os.getpid()}.tmp")
+            resized.save(temp_target, format=save_format, quality=90)
+            os.replace(temp_target, target)
+        derived[size_name] = relative_to_base(target)
+
+    signature = None
+    if similarity.available():
+        signature = similarity.compute_signatures([image_path]).get(image_path)
+
+    return {
+        "name": image_path.name,
+        "mtime_ns": stat.st_mtime_ns,
+        "bytes": stat.st_size,
+        "sha256": sha256,
+        "width": width,
+        "height": height,
+        "format": image_format,
+        "derived": derived,
+        "derived_sizes": {size_name: list(size) for size_name, size in DERIVED_SIZES.items()},
+        "signature": signature,
+    }
+
+
+def is_up_to_date(entry, image_path, derived_format):
+    if entry is None or entry.get("derived_format") != derived_format:
+        return False
+    if entry.get("derived_sizes") != {size_name: list(size) for size_name, size in DERIVED_SIZES.items()}:
+        return False
+    stat = image_path.stat()
+    if entry["mtime_ns"] != stat.st_mtime_ns or entry["bytes"] != stat.st_size:
+        return False
+    return all((BASE_DIR / rel_path).exists() for rel_path in entry["derived"].values())
+
+
+def merge_into_catalog(posters, results, posters_dir):
+    by_name = {}
+    for poster in posters:
+        if poster.get("image_path"):
+            by_name[poster_file_name(poster["image_path"])] = poster
+
+    next_id = max((poster["id"] for poster in posters), default=0) + 1
+    added = 0
+    for name in sorted(results):
+        result = results[name]
+        poster = by_name.get(name)
+        if poster is None:
+            poster = {
+                "id": next_id,
+                "title": Path(name).stem.replace("_", " ").replace("-", " ").title(),
+                "explanation": "",
+                "designer": "Unknown",
+                "year": None,
+            }
+            posters.append(poster)
+            next_id += 1
+            added += 1
+        poster["image_path"] = relative_to_base(Path(posters_dir) / name)
+        for field in ("width", "height", "format", "bytes", "sha256", "derived"):
+            poster[field] = result[field]
+    return added
+
+
+def report_near_duplicates(signatures, image_paths, new_names):
+    #only new or changed uploads are checked, against the whole collection
+    if not new_names:
+        return
+    index = similarity.SimilarityIndex()
+    for image_path in image_paths:
+        signature = signatures.get(similarity.signature_key(image_path))
+        if signature is not None:
+            index.add(image_path.name, signature)
+    checked = [name for name in new_names if name in index.signatures]
+    for name, other, distance in index.near_duplicates(poster_ids=checked):
+        print(f"Warning: {name} looks like a near-duplicate of {other} ({distance} bits apart)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan the posters directory and update posters.json.")
+    parser.add_argument("--posters-dir", default=BASE_DIR / "posters", type=Path)
+    parser.add_argument("--json", default=BASE_DIR / "data" / "posters.json", type=Path)
+    parser.add_argument("--manifest", default=BASE_DIR / "data" / "ingest_manifest.json", type=Path)
+    parser.add_argument("--derived-dir", default=BASE_DIR / "derived", type=Path)
+    parser.add_argument("--derived-format", default="jpeg", choices=sorted(DERIVED_FORMATS))
+    parser.add_argument("--workers", default=None, type=int)
+    parser.add_argument("--force", action="store_true", help="re-process every file even if unchanged")
+    parser.add_argument("--signatures", default=BASE_DIR / "cache" / "signatures.json", type=Path)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = load_json(args.manifest, {})
+    image_paths = sorted(
+        path for path in args.posters_dir.iterdir()
+        if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS
+    )
+
+    results = {}
+    signatures = similarity.SignatureStore(args.signatures)
+    new_names = []
+    to_process = []
+    for image_path in image_paths:
+        entry = manifest.get(image_path.name)
+        if not args.force and is_up_to_date(entry, image_path, args.derived_format):
+            results[image_path.name] = entry
+        else:
+            to_process.append(image_path)
+
+    print(f"Found {len(image_paths)} posters, {len(to_process)} new or changed")
+
+    if to_process:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {
+                executor.submit(ingest_file, str(path), str(args.derived_dir), args.derived_format): path
+                for path in to_process
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Error ingesting {path}: {e}")
+                    continue
+                result["derived_format"] = args.derived_format
+                signature = result.pop("signature")
+                if signature is not None:
+                    signatures.put(similarity.signature_key(path), signature)
+                    new_names.append(path.name)
+                results[path.name] = result
+                print(f"Ingested {path.name} ({result['width']}x{result['height']} {result['format']})")
+
+    for name in set(manifest) - set(results):
+        print(f"Warning: {name} is in the manifest but no longer in {args.posters_dir}")
+
+    posters = load_json(args.json, [])
+    added = merge_into_catalog(posters, results, args.posters_dir)
+    write_json(args.json, posters)
+    write_json(args.manifest, results)
+    signatures.save()
+    report_near_duplicates(signatures, image_paths, new_names)
+
+    print(f"Updated {args.json}: {len(posters)} posters ({added} added) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+from collections import deque
+from pathlib import Path
+import os
+import statistics
+import sys
+import time
+from process_decoder import to_photo
+from tracing import tracer
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def current_rss_kb():
+    #current rather than peak RSS, so a leak and a one-off spike look different
+    if psutil is not None:
+        return psutil.Process().memory_info().rss // 1024
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    #peak is the best the standard library offers here; it can rise but never fall
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+class KioskSlideshow:
+    #deadlines are fixed interval_ms apart from the start, so a late slide never pushes the rest back
+    def __init__(self, app, interval_ms=15000, lead_ms=3000, tolerance_ms=100, history=500):
+        self.app = app
+        self.root = app.root
+        self.interval_ms = interval_ms
+        self.lead_ms = min(lead_ms, interval_ms // 2)
+        self.tolerance_ms = tolerance_ms
+        self.after_ids = []
+        self.deadline = None
+        self.next_poster = None
+        self.ready = False
+        self.shown = 0
+        self.missed = deque(maxlen=history)
+        self.running = False
+
+    def start(self):
+        if len(self.app.posters) == 0:
+            print("Kiosk mode: the catalog is empty, nothing to show")
+            return
+        self.running = True
+        self.show(self.app.posters[0])
+        self.deadline = time.perf_counter() + self.interval_ms / 1000
+        self.schedule_next()
+
+    def stop(self):
+        self.running = False
+        for after_id in self.after_ids:
+            self.root.after_cancel(after_id)
+        self.after_ids = []
+        self.app.image_loader.cancel("kiosk")
+
+    def following(self, poster):
+        posters = self.app.posters
+        if not len(posters):
+            return None
+        if poster is None or poster.id not in posters:
+            candidate = posters[0]
+        else:
+            candidate = posters.next_of(poster.id) or posters[0]
+        #posters whose image is known to fail are skipped; None once the whole catalog has failed
+        for _ in range(len(posters)):
+            if not candidate.image_path or not self.app.negative_cache.failure(candidate.image_path):
+                return candidate
+            candidate = posters.next_of(candidate.id) or posters[0]
+        return None
+
+    def schedule_next(self):
+        self.next_poster = self.following(self.app.current_poster)
+        self.ready = False
+        now = time.perf_counter()
+        until_deadline = max(int((self.deadline - now) * 1000), 0)
+        self.after_ids = [
+            self.root.after(max(until_deadline - self.lead_ms, 0), self.prepare, self.next_poster),
+            self.root.after(until_deadline, self.advance),
+        ]
+
+    def slide_key(self, poster):
+        if not poster.image_path:
+            return None
+        return self.app.image_cache.make_key(Path(poster.image_path), *self.app.detail_image_size())
+
+    def prepare(self, poster):
+        #decode ahead of the deadline; the neighbour prefetcher has usually done this already
+        if poster is None:
+            return
+        if poster.image_path and self.app.negative_cache.failure(poster.image_path):
+            #failed since it was scheduled, e.g. in the prefetcher: prepare the slide after it instead
+            if poster is self.next_poster:
+                self.next_poster = self.following(poster)
+                self.prepare(self.next_poster)
+            return
+        key = self.slide_key(poster)
+        if key is None or key in self.app.image_cache:
+            self.ready = True
+            return
+
+        def on_ready(image):
+            self.app.image_cache.put(key, *to_photo(image))
+            if poster is self.next_poster:
+                self.ready = True
+
+        def on_error(error):
+            print(f"Kiosk mode: could not prepare {poster.image_path}: {error}")
+            self.app.negative_cache.record(poster.image_path, str(error))
+            if poster is self.next_poster:
+                self.next_poster = self.following(poster)
+
+        self.app.image_loader.submit("kiosk", self.app.resize_image, key, on_ready, on_error)
+
+    def advance(self):
+        if not self.running:
+            return
+        fired = time.perf_counter()
+        poster = self.next_poster
+        key = self.slide_key(poster) if poster is not None else None
+        ready = self.ready or key is None or key in self.app.image_cache
+        if poster is not None and poster.id in self.app.posters:
+            self.show(poster)
+        shown = time.perf_counter()
+
+        late_ms = (shown - self.deadline) * 1000
+        if not ready or late_ms > self.tolerance_ms:
+            reason = "not decoded in time" if not ready else "event loop busy"
+            self.missed.append((time.time(), poster.id if poster else None, late_ms, reason))
+            print(f"Kiosk mode: slide {poster.id if poster else '?'} was {late_ms:.0f} ms late ({reason})")
+
+        #skip whole intervals rather than firing a burst of catch-up slides after a long stall
+        self.deadline += self.interval_ms / 1000
+        while self.deadline < fired:
+            self.deadline += self.interval_ms / 1000
+        self.schedule_next()
+
+    def show(self, poster):
+        with tracer.span("kiosk slide", poster=poster.id):
+            self.app.show_poster_detail(poster)
+        self.shown += 1
+
+    def summary(self):
+        return f"Kiosk mode: {self.shown} slides shown, {len(self.missed)} missed deadlines"
+
+
+class MemoryWatchdog:
+    #samples RSS, live PhotoImages and widgets; a metric whose newest third of the last growth_samples
+    #samples sits more than growth above the oldest third is reported as unbounded growth
+    def __init__(self, root, interval_ms=60000, growth_samples=30, growth=0.10, log_path=None, history=1440):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.growth_samples = growth_samples
+        self.growth = growth
+        self.log_path = Path(log_path) if log_path else None
+        self.samples = deque(maxlen=history)
+        self.warned = set()
+        self.after_id = None
+
+    def start(self):
+        if self.log_path is not None and not self.log_path.exists():
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "w", encoding="utf-8") as file:
+                file.write("time,rss_kb,photo_images,widgets\n")
+        self.sample()
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def sample(self):
+        self.after_id = None
+        sample = (
+            time.time(),
+            current_rss_kb(),
+            len(self.root.tk.call("image", "names")),
+            count_widgets(self.root),
+        )
+        self.samples.append(sample)
+        if self.log_path is not None:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as file:
+                    file.write(",".join(str(value) for value in sample) + "\n")
+            except OSError as e:
+                print(f"Error writing watchdog log {self.log_path}: {e}")
+        self.check()
+        self.after_id = self.root.after(self.interval_ms, self.sample)
+
+    def check(self):
+        if len(self.samples) < self.growth_samples:
+            return
+        recent = list(self.samples)[-self.growth_samples:]
+        span = max(self.growth_samples // 3, 1)
+        for column, name in ((1, "RSS"), (2, "PhotoImage count"), (3, "widget count")):
+            values = [sample[column] for sample in recent]
+            if None in values:
+                continue
+            #medians of the oldest and newest thirds, so allocator noise and the screen the slideshow happens
+            #to be on do not count, while a leak that grows in steps still does
+            before = statistics.median(values[:span])
+            after = statistics.median(values[-span:])
+            growing = after > before * (1 + self.growth)
+            if growing and name not in self.warned:
+                self.warned.add(name)
+                print(
+                    f"Watchdog warning: {name} grew from {before} to {after} "
+                    f"over the last {self.growth_samples} samples"
+                )
+            elif not growing:
+                self.warned.discard(name)
+
+    def latest(self):
+        return self.samples[-1] if self.samples else None
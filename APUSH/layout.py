@@ -0,0 +1,73 @@
+from bisect import bisect_right
+
+#thumbnail boxes the gallery may use; each one has its own entries in the thumbnail caches
+THUMBNAIL_BUCKETS = ((120, 80), (150, 100), (180, 120), (240, 160), (300, 200))
+#title and info labels plus padding around the thumbnail inside a tile
+TILE_CHROME = (40, 90)
+PREFERRED_COLUMNS = 6
+#detail image sides snap down to one of these so nearby window sizes share cached variants
+DETAIL_LADDER = (320, 400, 480, 560, 640, 720, 800, 900, 1024, 1152, 1280, 1440, 1600, 1800, 2048)
+#explanation panel, paddings, title, navigation row and similar-posters strip around the detail image
+DETAIL_CHROME = (500, 400)
+#gallery padding plus its scrollbar
+GALLERY_CHROME = 40
+
+
+def snap_down(value, ladder):
+    index = bisect_right(ladder, value)
+    return ladder[max(index - 1, 0)]
+
+
+def gallery_layout(width):
+    #the largest thumbnail that still fits the preferred column count, else the smallest one
+    width = max(width - GALLERY_CHROME, 1)
+    chosen = THUMBNAIL_BUCKETS[0]
+    for bucket in THUMBNAIL_BUCKETS:
+        if width // (bucket[0] + TILE_CHROME[0]) >= PREFERRED_COLUMNS:
+            chosen = bucket
+    columns = max(width // (chosen[0] + TILE_CHROME[0]), 1)
+    return columns, chosen[1] + TILE_CHROME[1], chosen
+
+
+def detail_size(width, height):
+    return (
+        snap_down(width - DETAIL_CHROME[0], DETAIL_LADDER),
+        snap_down(height - DETAIL_CHROME[1], DETAIL_LADDER),
+    )
+
+
+class ResponsiveLayout:
+    #sizes only change once the window has been still for debounce_ms, so a drag costs no image work
+    def __init__(self, root, on_change, width, height, debounce_ms=200):
+        self.root = root
+        self.on_change = on_change
+        self.debounce_ms = debounce_ms
+        self.window_size = (width, height)
+        self.after_id = None
+        self.columns, self.tile_height, self.thumbnail_size = gallery_layout(width)
+        self.detail_size = detail_size(width, height)
+        root.bind("<Configure>", self.on_configure, add="+")
+
+    def on_configure(self, event):
+        #the toplevel binding also sees every child's Configure
+        if event.widget is not self.root or (event.width, event.height) == self.window_size:
+            return
+        self.window_size = (event.width, event.height)
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+        self.after_id = self.root.after(self.debounce_ms, self.apply)
+
+    def apply(self):
+        self.after_id = None
+        width, height = self.window_size
+        changed = set()
+        gallery = gallery_layout(width)
+        if gallery != (self.columns, self.tile_height, self.thumbnail_size):
+            self.columns, self.tile_height, self.thumbnail_size = gallery
+            changed.add("gallery")
+        detail = detail_size(width, height)
+        if detail != self.detail_size:
+            self.detail_size = detail
+            changed.add("detail")
+        if changed:
+            self.on_change(changed)
@@ -0,0 +1,148 @@
+from pathlib import Path
+import json
+import os
+import threading
+from catalog import PosterCatalog
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+COMPARED_FIELDS = ("title", "image_path", "designer", "year", "explanation")
+
+
+class CatalogDiff:
+    def __init__(self):
+        self.added = []
+        self.removed = []
+        self.changed = []
+        #old image paths that no longer belong to the poster that used them
+        self.stale_image_paths = []
+        self.reordered = False
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed or self.reordered)
+
+    def __str__(self):
+        return f"{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed"
+
+
+def reload_catalog(json_path, old_catalog, resolve_paths):
+    #runs on a worker thread; only reads old_catalog, and keeps its record objects for unchanged posters
+    #so the gallery's identity checks leave those tiles alone
+    with open(json_path, "r", encoding="utf-8") as file:
+        new_catalog = PosterCatalog.from_dicts(json.load(file))
+    resolve_paths(new_catalog)
+
+    old_explanations = {}
+    if any(record.explanation is None for record in old_catalog):
+        old_explanations = {record.id: explanation for record, explanation in old_catalog.iter_explanations()}
+
+    diff = CatalogDiff()
+    records = []
+    for record in new_catalog:
+        existing = old_catalog.get(record.id)
+        if existing is None:
+            diff.added.append(record.id)
+            records.append(record)
+            continue
+        old_fields = [getattr(existing, field) for field in COMPARED_FIELDS]
+        if existing.explanation is None:
+            old_fields[-1] = old_explanations.get(existing.id, "")
+        if old_fields == [getattr(record, field) for field in COMPARED_FIELDS]:
+            records.append(existing)
+        else:
+            diff.changed.append(record.id)
+            if existing.image_path and existing.image_path != record.image_path:
+                diff.stale_image_paths.append(existing.image_path)
+            records.append(record)
+
+    diff.removed = [record.id for record in old_catalog if record.id not in new_catalog]
+    for poster_id in diff.removed:
+        image_path = old_catalog.get(poster_id).image_path
+        if image_path:
+            diff.stale_image_paths.append(image_path)
+    diff.reordered = [record.id for record in old_catalog] != [record.id for record in new_catalog]
+
+    merged = PosterCatalog(records)
+    #unchanged records may still be lazy, and the database they come from has not changed
+    merged.explanation_loader = old_catalog.explanation_loader
+    return merged, diff
+
+
+class CatalogChangeHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        #editors often save through a temp file and rename, so the catalog can be either end of a move
+        paths = (getattr(event, "src_path", ""), getattr(event, "dest_path", ""))
+        if any(path and Path(path).name == self.watcher.path.name for path in paths):
+            self.watcher.dirty.set()
+
+
+class CatalogWatcher:
+    #watchdog (when installed) only raises a flag; the stat check and the callback always run on the Tk thread
+    def __init__(self, root, path, on_change, poll_ms=1000, settle_ms=300):
+        self.root = root
+        self.path = Path(path)
+        self.on_change = on_change
+        self.poll_ms = poll_ms
+        self.settle_ms = settle_ms
+        self.signature = self.read_signature()
+        self.pending_signature = None
+        self.dirty = threading.Event()
+        self.observer = None
+        self.after_id = None
+
+    def read_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self):
+        if Observer is not None:
+            try:
+                self.observer = Observer()
+                self.observer.schedule(CatalogChangeHandler(self), str(self.path.parent), recursive=False)
+                self.observer.daemon = True
+                self.observer.start()
+            except Exception as e:
+                print(f"Could not watch {self.path} ({e}); polling instead")
+                self.observer = None
+        self.schedule()
+
+    def schedule(self):
+        #with watchdog the tick only checks a flag, so it can run at the settle interval
+        waiting = self.pending_signature is not None or self.observer is not None
+        self.after_id = self.root.after(self.settle_ms if waiting else self.poll_ms, self.poll)
+
+    def poll(self):
+        self.after_id = None
+        if self.observer is None or self.dirty.is_set() or self.pending_signature is not None:
+            self.dirty.clear()
+            signature = self.read_signature()
+            if signature is None or signature == self.signature:
+                self.pending_signature = None
+            elif signature == self.pending_signature:
+                #unchanged across one settle interval, so the writer has finished
+                self.signature = signature
+                self.pending_signature = None
+                self.on_change()
+            else:
+                self.pending_signature = signature
+        self.schedule()
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer = None
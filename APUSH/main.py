@@ -1,45 +1,193 @@
+import time
+IMPORT_START = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
+from PIL import Image, ImageDraw, ImageTk
 from pathlib import Path
+import argparse
 import os
 import json
+from thumbnail_cache import ThumbnailCache
+from image_cache import ImageCache, DecodedAssetCache
+from image_loader import AsyncImageLoader, NeighborPrefetcher
+from catalog import PosterCatalog
+from gallery import VirtualGallery
+from decode import decode_resized, decode_stats
+from catalog_store import load_sqlite_catalog, is_stale
+from startup_profile import StartupProfile
+from tracing import tracer
+from deep_zoom import TilePyramid, ZoomCanvas
+from search import SearchIndex
+from content import HISTORICAL_TEXT, RESULTS_TEXT
+from live_reload import CatalogWatcher, reload_catalog
+from layout import ResponsiveLayout
+from process_decoder import ProcessDecoder, to_photo
+import similarity
+from kiosk import KioskSlideshow, MemoryWatchdog
+from path_resolver import NegativeCache, PathResolver, validate_catalog
+from thumbnail_atlas import ThumbnailAtlas, build_atlas
+from derived import DerivedImages
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_START
 
 class PosterAnalysisTool:
-    def __init__(self, root):
+    def __init__(self, root, image_cache_bytes=128 * 1024 * 1024, prefetch_window=1,
+                 gallery_decode_mode="fast", detail_decode_mode="quality", profile=None, print_profile=False,
+                 live_reload=True, responsive_layout=True, decode_backend="thread", kiosk_interval_ms=None,
+                 watchdog_interval_ms=60000, thumbnail_atlas=True, data_dir=None, cache_dir=None):
+        self.profile = profile if profile is not None else StartupProfile()
+        self.print_profile = print_profile
+        self.live_reload = live_reload
+        self.responsive_layout = responsive_layout
+        self.decode_backend = decode_backend
+        self.kiosk_interval_ms = kiosk_interval_ms
+        self.watchdog_interval_ms = watchdog_interval_ms
+        self.use_thumbnail_atlas = thumbnail_atlas
+        with self.profile.phase("widget construction"):
+            self.init_window(
+                root, image_cache_bytes, prefetch_window, gallery_decode_mode, detail_decode_mode, data_dir, cache_dir
+            )
+        #decode assets and parse the catalog only once the window has painted
+        self.root.after_idle(self.root.after, 0, self.finish_startup)
+    
+    def init_window(self, root, image_cache_bytes, prefetch_window, gallery_decode_mode, detail_decode_mode,
+                    data_dir=None, cache_dir=None):
         self.root = root
+        self.gallery_decode_mode = gallery_decode_mode
+        self.detail_decode_mode = detail_decode_mode
         self.root.title("APUSH Karis Poster Analysis Tool")
         
         self.base_dir = Path(__file__).parent.absolute()
         self.images_dir = self.base_dir / "images"
         self.posters_dir = self.base_dir / "posters"
-        self.data_dir = self.base_dir / "data"
+        #the catalog and everything the app writes back can live elsewhere, e.g. a benchmark's synthetic work dir
+        self.data_dir = Path(data_dir) if data_dir is not None else self.base_dir / "data"
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else self.base_dir / "cache"
+        self.thumbnail_cache = ThumbnailCache(self.cache_dir / "thumbnails")
+        #one mapped file of raw tiles per thumbnail size; the per-file cache covers posters it does not have yet
+        self.atlas_dir = self.cache_dir / "atlas"
+        self.atlas = None
+        self.tile_photos = {}
+        #survives screen changes; image_references only pins what the persistent screens currently show
+        self.image_cache = ImageCache(image_cache_bytes)
+        #"process" moves detail-size decodes out of the GUI process; thumbnails stay on threads and the disk cache
+        self.process_decoder = ProcessDecoder() if self.decode_backend == "process" else None
+        self.image_loader = AsyncImageLoader(self.root)
+        self.prefetcher = NeighborPrefetcher(
+            self.root, self.image_loader, self.image_cache, self.resize_image, window=prefetch_window
+        )
+        self.placeholders = {}
+        #catalog paths are mapped onto posters_dir; files that turn out missing or broken are not retried
+        #until they change on disk
+        self.path_resolver = PathResolver(self.base_dir, self.posters_dir)
+        self.negative_cache = NegativeCache()
+        #the reduced copies jpg2json.py writes at ingest stand in for the originals wherever they are big enough
+        self.derived_images = DerivedImages(self.data_dir / "ingest_manifest.json", self.base_dir)
+        self.assets = DecodedAssetCache()
         
         width = self.root.winfo_screenwidth()
         height = self.root.winfo_screenheight()
         self.root.bind('<Escape>', lambda e: self.create_welcome_screen())
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.root.geometry(f"{width}x{height}")
-        self.root.state('zoomed')
+        try:
+            self.root.state('zoomed')
+        except tk.TclError:
+            #X11 has no 'zoomed' window state
+            self.root.attributes('-zoomed', True)
+        #tile and detail image sizes follow the window, snapped to buckets so resizing reuses cached variants
+        self.layout = ResponsiveLayout(self.root, self.apply_layout, width, height) if self.responsive_layout else None
+        
+        self.left_decoration_image = None
+        self.right_decoration_image = None
+        #transparent stand-ins so the welcome layout does not jump when the real images arrive
+        self.blank_decoration_image = tk.PhotoImage(width=400, height=400)
+        self.posters = PosterCatalog()
         
+        self.current_poster = None
+        self.image_references = {}
+        self.screens = {}
+        self.current_screen = None
+        self.gallery = None
+        self.zoom_enabled = False
+        self.search_index = None
+        self.search_after_id = None
+        self.year_choices = {}
+        self.similarity_index = None
+        self.similar_shown = []
+        self.catalog_watcher = None
+        self.kiosk = None
+        self.watchdog = None
+        self.create_menu_button()
+        self.create_welcome_screen()
+    
+    def finish_startup(self):
+        self.profile.mark("first paint")
+        with self.profile.phase("asset decode"):
+            self.load_window_icon()
+            self.load_decoration_images()
+            self.welcome_left_label.config(image=self.left_decoration_image)
+            self.welcome_right_label.config(image=self.right_decoration_image)
+            self.load_welcome_poster()
+        with self.profile.phase("catalog parse"):
+            self.load_catalog()
+        self.validate_image_paths(self.posters)
+        self.build_thumbnail_atlas()
+        self.build_search_index()
+        self.build_similarity_index()
+        if self.live_reload:
+            self.catalog_watcher = CatalogWatcher(self.root, self.data_dir / 'posters.json', self.reload_catalog)
+            self.catalog_watcher.start()
+        self.profile.mark("startup complete")
+        if self.print_profile:
+            print(self.profile.report())
+            print(decode_stats.report())
+        if self.kiosk_interval_ms:
+            self.start_kiosk()
+    
+    def start_kiosk(self):
+        #unattended slideshow; the watchdog log shows whether memory stays flat over days
+        try:
+            self.root.attributes('-fullscreen', True)
+        except tk.TclError:
+            pass
+        self.watchdog = MemoryWatchdog(
+            self.root, self.watchdog_interval_ms, log_path=self.cache_dir / "kiosk_watchdog.csv"
+        )
+        self.watchdog.start()
+        self.kiosk = KioskSlideshow(self, self.kiosk_interval_ms)
+        self.kiosk.start()
+    
+    def load_window_icon(self):
         icon_path = self.images_dir / "sovietunion.PNG"
         try:
-            icon_image = Image.open(icon_path)
+            icon_image = self.assets.get(icon_path)
             icon_photo = ImageTk.PhotoImage(icon_image)
             self.root.wm_iconphoto(True, icon_photo)
             self.icon_photo = icon_photo
         except Exception as e:
             print(f"Error loading window icon: {e}")
-        
-        self.left_decoration_image = None
-        self.right_decoration_image = None
-        self.load_decoration_images()
-        self.posters = []
-        self.load_posters_from_json(self.data_dir / 'posters.json')
-        self.create_welcome_screen()
-        
-        self.current_poster = None
-        self.image_references = {}
+    
+    def on_close(self):
+        if self.atlas is not None:
+            self.atlas.close()
+        if self.kiosk is not None:
+            self.kiosk.stop()
+            print(self.kiosk.summary())
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        if self.catalog_watcher is not None:
+            self.catalog_watcher.stop()
+        self.prefetcher.cancel()
+        self.image_loader.shutdown()
+        if self.process_decoder is not None:
+            self.process_decoder.shutdown()
+        if self.print_profile:
+            #the whole session's decodes, by mode and route; the process backend's decodes are counted in its workers
+            print(decode_stats.report())
+        self.root.destroy()
     
     def bind_navigation_keys(self):
         self.root.bind('<Left>', lambda e: self.show_previous_poster())
@@ -51,38 +199,32 @@ class PosterAnalysisTool:
 
     def show_next_poster(self):
         if self.current_poster:
-            try:
-                current_index = next(i for i, p in enumerate(self.posters) if p['id'] == self.current_poster['id'])
-                if current_index < len(self.posters) - 1:
-                    self.show_poster_detail(self.posters[current_index + 1])
-            except StopIteration:
-                pass 
+            next_poster = self.posters.next_of(self.current_poster.id)
+            if next_poster is not None:
+                self.show_poster_detail(next_poster)
 
     def show_previous_poster(self):
         if self.current_poster:
-            try:
-                current_index = next(i for i, p in enumerate(self.posters) if p['id'] == self.current_poster['id'])
-                if current_index > 0:
-                    self.show_poster_detail(self.posters[current_index - 1])
-            except StopIteration:
-                pass
+            previous_poster = self.posters.previous_of(self.current_poster.id)
+            if previous_poster is not None:
+                self.show_poster_detail(previous_poster)
 
     def load_decoration_images(self):
         try:
             left_img_path = self.images_dir / "sovietunion.PNG"
-            left_img = Image.open(left_img_path) if left_img_path.exists() else None
+            left_img = self.assets.get(left_img_path) if left_img_path.exists() else None
             
             right_img_path = self.images_dir / "Flag_of_the_United_States.png"
-            right_img = Image.open(right_img_path) if right_img_path.exists() else None
+            right_img = self.assets.get(right_img_path) if right_img_path.exists() else None
             
             if left_img is None:
                 left_img = Image.new('RGB', (400, 400), color='#f0f0f0')
-                draw = Image.Draw(left_img)
+                draw = ImageDraw.Draw(left_img)
                 draw.text((50, 300), "Left Decoration", fill="black")
             
             if right_img is None:
                 right_img = Image.new('RGB', (400, 400), color='#f0f0f0')
-                draw = Image.Draw(right_img)
+                draw = ImageDraw.Draw(right_img)
                 draw.text((50, 300), "Right Decoration", fill="black")
             
             
@@ -99,42 +241,202 @@ class PosterAnalysisTool:
             self.left_decoration_image = ImageTk.PhotoImage(left_img)
             self.right_decoration_image = ImageTk.PhotoImage(right_img)
     
+    def load_catalog(self):
+        #prefer the SQLite catalog from catalog_store.py unless posters.json was edited after it was built
+        json_file = self.data_dir / 'posters.json'
+        db_file = self.data_dir / 'posters.db'
+        if not is_stale(json_file, db_file):
+            self.load_posters_from_sqlite(db_file)
+        else:
+            self.load_posters_from_json(json_file)
+    
+    def resolve_image_paths(self, catalog):
+        #jpg2json.py writes paths relative to the app folder; hand-written entries carry Windows paths
+        for poster in catalog:
+            poster.image_path = self.path_resolver.resolve_or_keep(poster.image_path)
+    
+    def validate_image_paths(self, catalog, poster_ids=None):
+        #header checks on loader threads, so broken files are in the negative cache before a screen asks for them
+        entries = [(poster.id, poster.image_path) for poster in catalog if poster_ids is None or poster.id in poster_ids]
+        
+        def on_checked(report):
+            print(report.summary())
+            if poster_ids is None:
+                report.write(self.cache_dir / "image_report.json")
+        
+        def on_error(error):
+            print(f"Error validating poster images: {error}")
+        
+        self.image_loader.submit(
+            "validate", validate_catalog, (entries, self.path_resolver, self.negative_cache), on_checked, on_error
+        )
+    
+    def load_posters_from_sqlite(self, db_file):
+        try:
+            self.posters = load_sqlite_catalog(db_file)
+            self.resolve_image_paths(self.posters)
+            print(f"Successfully loaded {len(self.posters)} posters from {db_file}")
+        except Exception as e:
+            print(f"Error loading SQLite catalog '{db_file}': {e}. Falling back to posters.json.")
+            self.load_posters_from_json(self.data_dir / 'posters.json')
+    
     def load_posters_from_json(self, json_file):
         try:
             with open(json_file, 'r', encoding='utf-8') as file:
-                self.posters = json.load(file)
+                self.posters = PosterCatalog.from_dicts(json.load(file))
+            self.resolve_image_paths(self.posters)
             print(f"Successfully loaded {len(self.posters)} posters from {json_file}")
         except FileNotFoundError:
             print(f"Error: JSON file '{json_file}' not found. Using empty poster list.")
-            self.posters = []
+            self.posters = PosterCatalog()
         except json.JSONDecodeError:
             print(f"Error: Invalid JSON format in '{json_file}'. Using empty poster list.")
-            self.posters = []
+            self.posters = PosterCatalog()
+        except (KeyError, ValueError) as e:
+            print(f"Error: Invalid poster entry in '{json_file}': {e}. Using empty poster list.")
+            self.posters = PosterCatalog()
     
-    def load_and_resize_image(self, image_path, max_width, max_height):
-        try:
-            original_image = Image.open(image_path)
-            
-            original_width, original_height = original_image.size
-            ratio = min(max_width/original_width, max_height/original_height)
-            new_width = int(original_width * ratio)
-            new_height = int(original_height * ratio)
-            
-            resized_image = original_image.resize((new_width, new_height), Image.LANCZOS)
+    def reload_catalog(self):
+        #parse and diff off the Tk thread; only the pieces that changed are touched when the result lands
+        json_file = self.data_dir / 'posters.json'
+        catalog = self.posters
+        
+        def on_loaded(result):
+            if self.posters is not catalog:
+                self.reload_catalog()
+                return
+            self.apply_catalog_reload(*result)
+        
+        def on_error(error):
+            print(f"Error reloading '{json_file}': {error}. Keeping the current posters.")
+        
+        self.image_loader.cancel("catalog-reload")
+        self.image_loader.submit(
+            "catalog-reload", reload_catalog, (json_file, catalog, self.resolve_image_paths), on_loaded, on_error
+        )
+    
+    def apply_catalog_reload(self, catalog, diff):
+        if not diff:
+            return
+        with tracer.span("apply catalog reload", diff=diff):
+            for image_path in diff.stale_image_paths:
+                self.image_cache.discard_path(image_path)
+            self.posters = catalog
+            self.validate_image_paths(catalog, set(diff.added + diff.changed))
+            self.build_thumbnail_atlas()
+            self.update_search_index(diff)
+            self.build_similarity_index()
             
-            photo_image = ImageTk.PhotoImage(resized_image)
+            if self.gallery is not None:
+                self.update_filter_choices()
+                self.run_search(keep_scroll=True)
             
-            return photo_image
-        except Exception as e:
-            print(f"Error loading image {image_path}: {e}")
-            placeholder = Image.new('RGB', (max_width, max_height), color='gray')
-            return ImageTk.PhotoImage(placeholder)
+            if self.current_poster is not None:
+                poster = catalog.get(self.current_poster.id)
+                if poster is None:
+                    self.current_poster = None
+                    if self.current_screen == "detail":
+                        self.show_poster_gallery()
+                elif self.current_screen == "detail" and poster is not self.current_poster:
+                    self.show_poster_detail(poster)
+                else:
+                    self.current_poster = poster
+        print(f"Reloaded posters.json: {diff}")
     
-    def create_welcome_screen(self):
-        self.clear_screen()
+    def update_search_index(self, diff, rebuild_threshold=500):
+        if self.search_index is None or len(diff.added) + len(diff.changed) > rebuild_threshold:
+            self.build_search_index()
+            return
+        for poster_id in diff.removed:
+            self.search_index.remove(poster_id)
+        for poster_id in diff.added + diff.changed:
+            poster = self.posters.get(poster_id)
+            self.search_index.update(poster, self.posters.explanation_of(poster))
+        self.search_index.set_positions(self.posters.positions)
+    
+    def resize_image(self, image_path, max_width, max_height):
+        source = self.derived_images.source_for(image_path, max_width, max_height)
+        if self.process_decoder is not None:
+            return self.process_decoder.decode(source, max_width, max_height, self.detail_decode_mode)
+        return decode_resized(source, max_width, max_height, self.detail_decode_mode)
+    
+    def resize_thumbnail(self, image_path, max_width, max_height):
+        source = self.derived_images.source_for(image_path, max_width, max_height)
+        return decode_resized(source, max_width, max_height, self.gallery_decode_mode)
+    
+    def load_and_resize_image(self, image_path, max_width, max_height):
+        with tracer.span("load_and_resize_image", path=image_path, size=f"{max_width}x{max_height}"):
+            key = self.image_cache.make_key(image_path, max_width, max_height)
+            cached = self.image_cache.get(key)
+            if cached is not None:
+                return cached[1]
+            if self.negative_cache.failure(image_path):
+                return self.placeholder_image(max_width, max_height, 'gray')
+            try:
+                resized_image = self.resize_image(image_path, max_width, max_height)
+                
+                with tracer.span("PhotoImage"):
+                    resized_image, photo_image = to_photo(resized_image)
+                self.image_cache.put(key, resized_image, photo_image)
+                
+                return photo_image
+            except Exception as e:
+                print(f"Error loading image {image_path}: {e}")
+                self.negative_cache.record(image_path, str(e))
+                return self.placeholder_image(max_width, max_height, 'gray')
+    
+    def placeholder_image(self, max_width, max_height, color='#e0e0e0'):
+        #one shared PhotoImage per size and colour; light gray while loading, darker for a missing image
+        key = (max_width, max_height, color)
+        if key not in self.placeholders:
+            placeholder = Image.new('RGB', (max_width, max_height), color=color)
+            self.placeholders[key] = ImageTk.PhotoImage(placeholder)
+        return self.placeholders[key]
+    
+    def load_thumbnail_async(self, image_label, image_path, max_width, max_height, reference_key, still_wanted=None):
+        #gallery thumbnails go through the on-disk cache so a warm open only reads small files
+        key = self.image_cache.make_key(image_path, max_width, max_height)
+        cached = self.image_cache.get(key)
+        if cached is not None:
+            self.image_references[reference_key] = cached[1]
+            image_label.config(image=cached[1])
+            return None
+        
+        if self.negative_cache.failure(image_path):
+            image_label.config(image=self.placeholder_image(max_width, max_height, 'gray'))
+            return None
+        image_label.config(image=self.placeholder_image(max_width, max_height))
         
+        def on_loaded(thumb):
+            with tracer.span("PhotoImage"):
+                photo_image = ImageTk.PhotoImage(thumb)
+            self.image_cache.put(key, thumb, photo_image)
+            if not image_label.winfo_exists() or (still_wanted and not still_wanted()):
+                return
+            self.image_references[reference_key] = photo_image
+            image_label.config(image=photo_image)
+        
+        def on_error(error):
+            print(f"Error loading image {image_path}: {error}")
+            self.negative_cache.record(image_path, str(error))
+            if image_label.winfo_exists():
+                image_label.config(image=self.placeholder_image(max_width, max_height, 'gray'))
+        
+        return self.image_loader.submit(
+            "screen",
+            self.thumbnail_cache.get_or_create,
+            (image_path, max_width, max_height, self.gallery_decode_mode, self.resize_thumbnail),
+            on_loaded,
+            on_error
+        )
+    
+    def create_welcome_screen(self):
+        self.show_screen("welcome", self.build_welcome_screen)
+        self.prefetcher.cancel()
+        self.root.bind('<Return>', lambda e: self.show_poster_gallery())
+    
+    def build_welcome_screen(self):
         welcome_frame = tk.Frame(self.root, bg="#85321A")
-        welcome_frame.pack(expand=True, fill="both")
         
         context_button = tk.Button(
             welcome_frame,
@@ -149,13 +451,19 @@ class PosterAnalysisTool:
         )
         context_button.place(relx=0.02, rely=0.02, anchor="nw")
         
-        if self.left_decoration_image:
-            left_img_label = tk.Label(welcome_frame, image=self.left_decoration_image, bg="#85321A")
-            left_img_label.pack(side="left", padx=20)
+        self.welcome_left_label = tk.Label(
+            welcome_frame,
+            image=self.left_decoration_image or self.blank_decoration_image,
+            bg="#85321A"
+        )
+        self.welcome_left_label.pack(side="left", padx=20)
         
-        if self.right_decoration_image:
-            right_img_label = tk.Label(welcome_frame, image=self.right_decoration_image, bg="#85321A")
-            right_img_label.pack(side="right", padx=20)
+        self.welcome_right_label = tk.Label(
+            welcome_frame,
+            image=self.right_decoration_image or self.blank_decoration_image,
+            bg="#85321A"
+        )
+        self.welcome_right_label.pack(side="right", padx=20)
         
         main_content_frame = tk.Frame(welcome_frame, bg="#85321A")
         main_content_frame.pack(expand=True, fill="both")
@@ -184,34 +492,15 @@ class PosterAnalysisTool:
         )
         title_line2.pack()
         
-        try:
-            poster_path = self.posters_dir / "poster.jpg"
-            poster_img = Image.open(poster_path)
-            
-            max_width = 600 
-            max_height = 400 
-            poster_img.thumbnail((max_width, max_height), Image.LANCZOS)
-            
-            poster_photo = ImageTk.PhotoImage(poster_img)
-            
-            self.image_references["welcome_poster"] = poster_photo
-            
-            poster_label = tk.Label(
-                center_frame,
-                image=poster_photo,
-                bg="#85321A"
-            )
-            poster_label.pack(pady=20) 
-        except Exception as e:
-            print(f"Error loading poster image: {e}")
-            poster_label = tk.Label(
-                center_frame,
-                text="[Featured Poster]",
-                font=("Arial", 12),
-                bg="#85321A",
-                fg="#F2D19F"
-            )
-            poster_label.pack(pady=20)
+        self.welcome_poster_label = tk.Label(
+            center_frame,
+            font=("Arial", 12),
+            bg="#85321A",
+            fg="#F2D19F"
+        )
+        self.welcome_poster_label.pack(pady=20)
+        if "welcome_poster" in self.image_references:
+            self.welcome_poster_label.config(image=self.image_references["welcome_poster"])
         
         instruction_label = tk.Label(
             center_frame,
@@ -235,14 +524,32 @@ class PosterAnalysisTool:
         )
         extra_details.pack()
         
-        self.create_menu_button()
-        
-        self.root.bind('<Return>', lambda e: self.show_poster_gallery())
+        return welcome_frame
+    
+    def load_welcome_poster(self):
+        try:
+            poster_path = self.posters_dir / "poster.jpg"
+            if not poster_path.exists():
+                raise FileNotFoundError(poster_path)
+            
+            max_width = 600 
+            max_height = 400 
+            poster_photo = self.load_and_resize_image(poster_path, max_width, max_height)
+            
+            self.image_references["welcome_poster"] = poster_photo
+            self.welcome_poster_label.config(image=poster_photo)
+        except Exception as e:
+            print(f"Error loading poster image: {e}")
+            self.welcome_poster_label.config(text="[Featured Poster]")
     
     def show_written_response(self):
-        self.clear_screen()
+        self.show_screen("written_response", self.build_written_response)
+        self.prefetcher.cancel()
+    
+    def build_written_response(self):
+        screen_frame = tk.Frame(self.root)
         
-        main_frame = tk.Frame(self.root)
+        main_frame = tk.Frame(screen_frame)
         main_frame.pack(expand=True, fill="both", padx=10, pady=10)
         
         text_frame = tk.Frame(main_frame, width=600, bd=2, relief="ridge")
@@ -265,39 +572,7 @@ class PosterAnalysisTool:
             pady=10
         )
         
-        historical_text = """The Cold War (1947-1991) was a period of great tension between the Soviet Union and the US and their respective allies. Propaganda posters played a crucial role in shaping public opinion on both sides.
-
-Key Themes in Cold War Propaganda:
-
-1. Ideological Conflict: Posters emphasized the superiority of capitalism/democracy or communism, portraying the opposing system as oppressive or immoral.
-
-2. Nuclear Threat: Many posters addressed the fear of nuclear war, either by promoting disarmament or by portraying the enemy as an aggressor.
-
-3. Economic Competition: Posters often contrasted the prosperity of one system with the supposed failures of the other.
-
-4. Patriotism and Defense: Many posters encouraged military service or civil defense preparedness.
-
-5. Use of stereotypes: Posters would use popular figures that were fictional or real, such as Uncle Sam. 
-
-The posters reveal how each side wanted to define itself in opposition to the other, using powerful imagery and easy to understand messages to appeal to emotions rather than rational argument."""
-
-        results_text = """
-
-    RESULTS OF PROPAGANDA:
-
-    1. Changed Public Opinion: Propaganda deepened the divide between capitalist and communist ideologies, making compromise more difficult.
-    2. Increased Military Spending: posters contributed to the arms race and increased defense budgets in both side.
-    3. Cultural Stereotypes: Propaganda created lasting stereotypes about both sides that are still present even today.
-    4. Political Mobilization: Posters were effective at getting citizens to get behind government policies and military actions.
-    5. Distrust in Media: The extremist propaganda led many to become skeptical of all government messaging, a legacy that continues in modern politics.
-    6. Artistic Legacy: While serving political purposes, these posters also represent significant works of graphic design and political art.
-    
-    According to http://large.stanford.edu/courses/2017/ph241/le2/, Exploring the Impact of Propaganda during the Cold War by Professor Adrien Ivan,
-    sentiment towards the other side became much more prominent, as American were becoming increasingly radical towards soviet ideas, and vice versa.
-    Propaganda also puposely justified the arms race.
-    """
-
-        text_content.insert("1.0", historical_text + results_text)
+        text_content.insert("1.0", HISTORICAL_TEXT + RESULTS_TEXT)
         
         text_content.tag_add("bold", "1.0", "end")
         text_content.tag_config("bold", font=("Arial", 14))
@@ -366,6 +641,8 @@ The posters reveal how each side wanted to define itself in opposition to the ot
             pady=5
         )
         back_button.pack(pady=20)
+        
+        return screen_frame
     
     def create_menu_button(self):
         self.menu_button = tk.Button(
@@ -378,97 +655,425 @@ The posters reveal how each side wanted to define itself in opposition to the ot
         )
         self.menu_button.place(relx=0.95, rely=0.02, anchor="ne")
     
+    def show_screen(self, name, build):
+        #each screen is built once and kept; switching just raises its frame
+        self.clear_screen()
+        tracer.set_screen(name)
+        if name not in self.screens:
+            with tracer.span(f"build {name}"):
+                screen_frame = build()
+                screen_frame.place(x=0, y=0, relwidth=1, relheight=1)
+            self.screens[name] = screen_frame
+        self.screens[name].tkraise()
+        self.menu_button.tkraise()
+        self.current_screen = name
+        if tracer.enabled:
+            #geometry normally runs later as an idle task; force it here so it shows up under this screen
+            self.root.after_idle(self.trace_geometry)
+        return self.screens[name]
+    
+    def trace_geometry(self):
+        with tracer.span("geometry"):
+            self.root.update_idletasks()
+    
     def clear_screen(self):
-        for widget in self.root.winfo_children():
-            if widget not in [self.menu_button]:
-                widget.destroy()
-        self.image_references = {}
+        with tracer.span("clear_screen"):
+            #results for the screen we are leaving must never land on it after it is hidden
+            self.image_loader.cancel("screen")
+            self.unbind_navigation_keys()
+    
+    def detail_image_size(self):
+        if self.layout is not None:
+            return self.layout.detail_size
+        screen_width = self.root.winfo_screenwidth()
+        screen_height = self.root.winfo_screenheight()
+        return int(screen_width * 0.6), int(screen_height * 0.6)
+    
+    def poster_image_path(self, index):
+        image_path = self.posters[index].image_path
+        if not image_path or self.negative_cache.failure(image_path):
+            return None
+        return Path(image_path)
     
     def show_poster_gallery(self):
-        self.clear_screen()
+        first_visit = "gallery" not in self.screens
+        self.show_screen("gallery", self.build_poster_gallery)
+        self.prefetcher.cancel()
         self.root.unbind('<Return>')
-        self.unbind_navigation_keys() 
+        if not first_visit:
+            #thumbnail jobs were cancelled when we left; re-request anything still on a placeholder
+            self.gallery.refresh(force=True)
+    
+    def build_poster_gallery(self):
+        screen_frame = tk.Frame(self.root)
         
-        main_frame = tk.Frame(self.root)
+        main_frame = tk.Frame(screen_frame)
         main_frame.pack(expand=True, fill="both", padx=10, pady=10)
         
-        grid_frame = tk.Frame(main_frame)
-        grid_frame.pack(side="left", fill="both", expand=True)
+        search_frame = tk.Frame(main_frame)
+        search_frame.pack(side="top", fill="x", pady=(0, 10))
         
-        rows, cols = 4, 6
-        for i in range(rows):
-            grid_frame.rowconfigure(i, weight=1)
-        for j in range(cols):
-            grid_frame.columnconfigure(j, weight=1)
+        search_label = tk.Label(
+            search_frame,
+            text="Search:",
+            font=("Arial", 12)
+        )
+        search_label.pack(side="left")
         
-        #calculate which posters to show (in case we have less than 24)
-        posters_to_show = min(24, len(self.posters))
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(
+            search_frame,
+            textvariable=self.search_var,
+            font=("Arial", 12),
+            width=40
+        )
+        search_entry.pack(side="left", padx=10)
+        self.search_var.trace_add("write", lambda *args: self.schedule_search())
         
-        for idx in range(posters_to_show):
-            poster = self.posters[idx]
-            row = idx // cols
-            col = idx % cols
-            
-            poster_frame = tk.Frame(
-                grid_frame,
-                bd=2,
-                relief="ridge",
-                bg="white",
-                padx=5,
-                pady=5
+        #year, designer and order views come straight from the catalog's indexes
+        self.year_var = tk.StringVar(value="All")
+        self.designer_var = tk.StringVar(value="All")
+        self.order_var = tk.StringVar(value="Catalog order")
+        self.filter_boxes = {}
+        for label, variable, width in (("Year:", self.year_var, 8), ("Designer:", self.designer_var, 20)):
+            tk.Label(search_frame, text=label, font=("Arial", 12)).pack(side="left")
+            box = ttk.Combobox(search_frame, textvariable=variable, state="readonly", width=width)
+            box.pack(side="left", padx=(5, 10))
+            box.bind("<<ComboboxSelected>>", lambda e: self.run_search())
+            self.filter_boxes[label] = box
+        order_box = ttk.Combobox(
+            search_frame,
+            textvariable=self.order_var,
+            values=["Catalog order", "Chronological"],
+            state="readonly",
+            width=14
+        )
+        order_box.pack(side="left", padx=(0, 10))
+        order_box.bind("<<ComboboxSelected>>", lambda e: self.run_search())
+        self.update_filter_choices()
+        
+        self.search_status_label = tk.Label(
+            search_frame,
+            font=("Arial", 10),
+            fg="#555555"
+        )
+        self.search_status_label.pack(side="left")
+        
+        self.gallery = VirtualGallery(main_frame, self.show_poster_detail, self.load_gallery_tile_image)
+        if self.layout is not None:
+            self.gallery.set_layout(self.layout.columns, self.layout.tile_height, self.layout.thumbnail_size)
+        self.gallery.pack(side="left", fill="both", expand=True)
+        self.gallery.set_items(self.browse_items())
+        
+        return screen_frame
+    
+    def update_filter_choices(self):
+        #called when the gallery is built and after a reload; a choice the new catalog lacks falls back to All
+        self.year_choices = {str(year): year for year in self.posters.years()}
+        designers = self.posters.designers()
+        self.filter_boxes["Year:"].config(values=["All", *self.year_choices])
+        self.filter_boxes["Designer:"].config(values=["All", *designers])
+        if self.year_var.get() not in self.year_choices:
+            self.year_var.set("All")
+        if self.designer_var.get() not in designers:
+            self.designer_var.set("All")
+    
+    def browse_filters(self):
+        year = self.year_choices.get(self.year_var.get())
+        designer = self.designer_var.get()
+        return year, designer if designer != "All" else None
+    
+    def browse_items(self):
+        #what the gallery shows without a search: the catalog itself, a filtered view, or chronological order
+        year, designer = self.browse_filters()
+        filtered = year is not None or designer is not None
+        if self.order_var.get() == "Chronological":
+            items = self.posters.chronological()
+            if filtered:
+                wanted = {poster.id for poster in self.posters.filter(year=year, designer=designer)}
+                items = [poster for poster in items if poster.id in wanted]
+            return items
+        return self.posters.filter(year=year, designer=designer) if filtered else self.posters
+    
+    def build_search_index(self):
+        #tokenizing every explanation is too slow for the Tk thread on large catalogs
+        catalog = self.posters
+        
+        def on_built(index):
+            if self.posters is catalog:
+                self.search_index = index
+                if self.gallery is not None and self.search_var.get().strip():
+                    self.run_search()
+        
+        def on_error(error):
+            print(f"Error building search index: {error}")
+        
+        self.search_index = None
+        self.image_loader.submit("search-index", SearchIndex.from_catalog, (catalog,), on_built, on_error)
+    
+    def build_similarity_index(self):
+        #hashes are read from cache/signatures.json, so only images nobody has hashed yet get decoded;
+        #without NumPy nothing new is hashed but stored signatures are still used
+        catalog = self.posters
+        images = [(poster.id, poster.image_path) for poster in catalog if poster.image_path]
+        
+        def on_built(index):
+            if self.posters is catalog:
+                self.similarity_index = index
+                if self.current_screen == "detail" and self.current_poster is not None:
+                    self.show_similar_posters(self.current_poster)
+        
+        def on_error(error):
+            print(f"Error building similarity index: {error}")
+        
+        self.image_loader.submit(
+            "similarity",
+            similarity.build_similarity_index,
+            (images, self.cache_dir / "signatures.json"),
+            on_built,
+            on_error
+        )
+    
+    def schedule_search(self, delay_ms=150):
+        #debounced so a burst of keystrokes only runs one query
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(delay_ms, self.run_search)
+    
+    def run_search(self, keep_scroll=False):
+        self.search_after_id = None
+        show_items = self.gallery.replace_items if keep_scroll else self.gallery.set_items
+        query = self.search_var.get()
+        year, designer = self.browse_filters()
+        if not query.strip():
+            items = self.browse_items()
+            filtered = year is not None or designer is not None
+            self.search_status_label.config(
+                text=f"{len(items)} poster{'s' if len(items) != 1 else ''}" if filtered else ""
             )
-            poster_frame.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-            poster_frame.bind("<Button-1>", lambda e, p=poster: self.show_poster_detail(p))
+            show_items(items)
+            return
+        if self.search_index is None:
+            self.search_status_label.config(text="Indexing posters...")
+            return
+        #broad prefixes on a large catalog take tens of milliseconds, so the query runs on a loader thread
+        catalog = self.posters
+        search_index = self.search_index
+        filtered = year is not None or designer is not None
+        #only the first few screens are ranked per keystroke; the rest is fetched when the gallery scrolls near
+        #the end. Filters narrow the ranking after the fact, so a filtered search ranks every match up front
+        limit = None if filtered else max(len(self.gallery.tiles) * 3, 60)
+        self.gallery.on_near_end = None
+        
+        def find(limit):
+            with tracer.span("search", query=query, limit=limit):
+                return search_index.search_page(query, limit)
+        
+        def current():
+            return self.posters is catalog and self.search_var.get() == query
+        
+        def on_found(page):
+            if not current():
+                return
+            poster_ids, total = page
+            results = [catalog.get(poster_id) for poster_id in poster_ids]
+            results = [poster for poster in results if poster is not None]
+            if filtered:
+                #results keep their ranking; the filters only narrow them
+                wanted = {poster.id for poster in catalog.filter(year=year, designer=designer)}
+                results = [poster for poster in results if poster.id in wanted]
+                total = len(results)
+            self.search_status_label.config(text=f"{total} result{'s' if total != 1 else ''}")
+            show_items(results)
+            if len(poster_ids) < total:
+                self.gallery.on_near_end = fetch_rest
+        
+        def fetch_rest():
+            self.image_loader.submit("search", find, (None,), on_rest, on_error)
+        
+        def on_rest(page):
+            if not current():
+                return
+            results = [catalog.get(poster_id) for poster_id in page[0]]
+            self.gallery.replace_items([poster for poster in results if poster is not None])
+        
+        def on_error(error):
+            print(f"Error searching for {query!r}: {error}")
+        
+        self.image_loader.cancel("search")
+        self.image_loader.submit("search", find, (limit,), on_found, on_error)
+    
+    def gallery_thumbnail_size(self):
+        return self.layout.thumbnail_size if self.layout is not None else (150, 100)
+    
+    def build_thumbnail_atlas(self):
+        #incremental: only posters added or changed since the last build are decoded
+        if not self.use_thumbnail_atlas:
+            return
+        catalog = self.posters
+        thumbnail_size = self.gallery_thumbnail_size()
+        entries = [
+            (poster.id, poster.image_path) for poster in catalog
+            if poster.image_path and not self.negative_cache.failure(poster.image_path)
+        ]
+        
+        def on_built(stats):
+            for error in stats["errors"]:
+                print(f"Error adding thumbnail to atlas: {error}")
+            if self.posters is not catalog or self.gallery_thumbnail_size() != thumbnail_size:
+                return
+            atlas = ThumbnailAtlas(self.atlas_dir, thumbnail_size)
+            if not atlas.open():
+                return
+            if self.atlas is not None:
+                self.atlas.close()
+            self.atlas = atlas
+            if self.gallery is not None and self.current_screen == "gallery":
+                self.gallery.refresh(force=True)
+        
+        def on_error(error):
+            print(f"Error building thumbnail atlas: {error}")
+        
+        self.image_loader.cancel("atlas")
+        self.image_loader.submit(
+            "atlas", build_atlas, (self.atlas_dir, thumbnail_size, entries, self.resize_thumbnail), on_built, on_error
+        )
+    
+    def show_atlas_tile(self, tile, image):
+        #each tile keeps one PhotoImage and pastes new pixels into it, so scrolling creates no Tk images
+        reference_key = f"tile_{id(tile)}"
+        photo_image = self.tile_photos.get(reference_key)
+        if photo_image is None or (photo_image.width(), photo_image.height()) != image.size:
+            photo_image = ImageTk.PhotoImage(image)
+            self.tile_photos[reference_key] = photo_image
+        else:
+            photo_image.paste(image)
+        self.image_references[reference_key] = photo_image
+        tile.image_label.config(image=photo_image)
+    
+    def load_gallery_tile_image(self, tile, poster):
+        if self.atlas is not None and tuple(self.gallery.thumbnail_size) == self.atlas.thumbnail_size:
+            with tracer.span("atlas tile", poster=poster.id):
+                image = self.atlas.image(poster.id, poster.image_path)
+                if image is not None:
+                    self.show_atlas_tile(tile, image)
+                    return None
+        #references are keyed by tile rather than poster so they stay bounded by the pool size
+        return self.load_thumbnail_async(
+            tile.image_label,
+            Path(poster.image_path),
+            *self.gallery.thumbnail_size,
+            f"tile_{id(tile)}",
+            lambda: tile.is_showing(poster)
+        )
+    
+    def show_poster_detail(self, poster):
+        self.show_screen("detail", self.build_poster_detail)
+        self.current_poster = poster
+        self.bind_navigation_keys() 
+        
+        with tracer.span("update detail text", poster=poster.id):
+            self.detail_designer_label.config(text=f"Designer: {poster.designer}")
+            self.detail_year_label.config(text=f"Year: {poster.year if poster.year is not None else 'N/A'}")
             
-            title_label = tk.Label(
-                poster_frame,
-                text=poster['title'],
-                font=("Arial", 10, "bold"),
-                bg="white"
-            )
-            title_label.pack(pady=5)
+            self.detail_explanation_text.config(state="normal")
+            self.detail_explanation_text.delete("1.0", "end")
+            self.detail_explanation_text.insert("1.0", self.posters.explanation_of(poster))
+            self.detail_explanation_text.config(state="disabled")
+            self.detail_explanation_text.yview_moveto(0)
             
-            #aaaaaaaaaaa
-            info_label = tk.Label(
-                poster_frame,
-                text=f"{poster.get('designer', 'Unknown')}, {poster.get('year', 'N/A')}",
-                font=("Arial", 8),
-                bg="white"
+            self.detail_title_label.config(text=poster.title)
+        
+        if poster.image_path and self.zoom_enabled:
+            self.load_zoom_pyramid(poster)
+        elif poster.image_path:
+            self.show_detail_image(poster)
+        else:
+            self.image_references.pop("detail_image", None)
+            if self.zoom_enabled:
+                self.set_zoom(False)
+            self.detail_image_label.config(
+                image="",
+                text="No Image Available",
+                width=40,
+                height=25,
+                bg="#e0e0e0",
+                relief="sunken"
             )
-            info_label.pack()
-            
-            if 'image_path' in poster and poster['image_path']:
-                image_path = Path(poster['image_path']) if not isinstance(poster['image_path'], Path) else poster['image_path']
-                
-                thumb_image = self.load_and_resize_image(image_path, 150, 100)
-                self.image_references[f"thumb_{poster['id']}"] = thumb_image
-                
-                image_label = tk.Label(
-                    poster_frame,
-                    image=thumb_image,
-                    bg="white"
+        
+        self.show_similar_posters(poster)
+        
+        index = self.posters.index_of(poster.id)
+        if index is not None:
+            max_width, max_height = self.detail_image_size()
+            self.prefetcher.schedule(index, len(self.posters), self.poster_image_path, max_width, max_height)
+    
+    def show_detail_image(self, poster):
+        image_path = Path(poster.image_path)
+        
+        max_width, max_height = self.detail_image_size()
+        
+        full_image = self.load_and_resize_image(image_path, max_width, max_height)
+        self.image_references["detail_image"] = full_image
+        
+        self.detail_image_label.config(
+            image=full_image,
+            text="",
+            width=0,
+            height=0,
+            bg="white",
+            relief="flat"
+        )
+    
+    def show_similar_posters(self, poster):
+        similar = []
+        if self.similarity_index is not None:
+            with tracer.span("similar posters", poster=poster.id):
+                poster_ids = self.similarity_index.similar(poster.id, len(self.detail_similar_slots))
+            similar = [self.posters.get(poster_id) for poster_id in poster_ids]
+            similar = [other for other in similar if other is not None and other.image_path]
+        self.similar_shown = similar
+        self.detail_similar_title.config(text="Similar posters" if similar else "")
+        
+        for slot, (image_label, caption_label) in enumerate(self.detail_similar_slots):
+            if slot < len(similar):
+                other = similar[slot]
+                caption_label.config(text=other.title)
+                for widget in (image_label, caption_label):
+                    widget.bind("<Button-1>", lambda e, other=other: self.show_poster_detail(other))
+                self.load_thumbnail_async(
+                    image_label,
+                    Path(other.image_path),
+                    120,
+                    80,
+                    f"similar_{slot}",
+                    lambda slot=slot, other=other: slot < len(self.similar_shown) and self.similar_shown[slot] is other
                 )
-                image_label.pack(pady=5)
             else:
-                placeholder = tk.Label(
-                    poster_frame,
-                    text="No Image",
-                    width=15,
-                    height=8,
-                    bg="#e0e0e0",
-                    relief="sunken"
-                )
-                placeholder.pack(pady=5)
-            
-            for child in poster_frame.winfo_children():
-                child.bind("<Button-1>", lambda e, p=poster: self.show_poster_detail(p))
+                image_label.config(image="")
+                caption_label.config(text="")
+                for widget in (image_label, caption_label):
+                    widget.unbind("<Button-1>")
+                self.image_references.pop(f"similar_{slot}", None)
     
-    def show_poster_detail(self, poster):
-        self.clear_screen()
-        self.current_poster = poster
-        self.bind_navigation_keys() 
+    def apply_layout(self, changed):
+        #called once the window has settled on a new size bucket, never during a drag
+        with tracer.span("apply layout", changed=",".join(sorted(changed))):
+            if "gallery" in changed:
+                self.build_thumbnail_atlas()
+            if "gallery" in changed and self.gallery is not None:
+                self.gallery.set_layout(self.layout.columns, self.layout.tile_height, self.layout.thumbnail_size)
+            if ("detail" in changed and self.current_screen == "detail" and self.current_poster is not None
+                    and self.current_poster.image_path and not self.zoom_enabled):
+                self.show_detail_image(self.current_poster)
+                index = self.posters.index_of(self.current_poster.id)
+                if index is not None:
+                    self.prefetcher.schedule(index, len(self.posters), self.poster_image_path, *self.layout.detail_size)
+    
+    def build_poster_detail(self):
+        screen_frame = tk.Frame(self.root)
         
-        main_frame = tk.Frame(self.root)
+        main_frame = tk.Frame(screen_frame)
         main_frame.pack(expand=True, fill="both", padx=10, pady=10)
         
         explanation_frame = tk.Frame(main_frame, width=400, bd=2, relief="ridge")
@@ -486,83 +1091,58 @@ The posters reveal how each side wanted to define itself in opposition to the ot
         meta_frame = tk.Frame(explanation_frame)
         meta_frame.pack(pady=5)
         
-        designer_label = tk.Label(
+        self.detail_designer_label = tk.Label(
             meta_frame,
-            text=f"Designer: {poster.get('designer', 'Unknown')}",
             font=("Arial", 12),
             anchor="w"
         )
-        designer_label.pack(fill="x")
+        self.detail_designer_label.pack(fill="x")
         
-        year_label = tk.Label(
+        self.detail_year_label = tk.Label(
             meta_frame,
-            text=f"Year: {poster.get('year', 'N/A')}",
             font=("Arial", 12),
             anchor="w"
         )
-        year_label.pack(fill="x")
+        self.detail_year_label.pack(fill="x")
         
-        explanation_text = tk.Text(
+        self.detail_explanation_text = tk.Text(
             explanation_frame,
             wrap="word",
             font=("Helvetica", 25),
             padx=10,
-            pady=10
+            pady=10,
+            state="disabled"
         )
-        explanation_text.insert("1.0", poster['explanation'])
-        explanation_text.config(state="disabled")
         
-        scrollbar = ttk.Scrollbar(explanation_frame, orient="vertical", command=explanation_text.yview)
-        explanation_text.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(explanation_frame, orient="vertical", command=self.detail_explanation_text.yview)
+        self.detail_explanation_text.configure(yscrollcommand=scrollbar.set)
         
         scrollbar.pack(side="right", fill="y")
-        explanation_text.pack(side="left", fill="both", expand=True)
+        self.detail_explanation_text.pack(side="left", fill="both", expand=True)
         
         poster_frame = tk.Frame(main_frame, bd=2, relief="ridge", bg="white")
         poster_frame.pack(side="right", fill="both", expand=True)
         
-        poster_title = tk.Label(
+        self.detail_title_label = tk.Label(
             poster_frame,
-            text=poster['title'],
             font=("Arial", 30, "bold"),
             bg="white",
             pady=20
         )
-        poster_title.pack()
+        self.detail_title_label.pack()
         
-        if 'image_path' in poster and poster['image_path']:
-            image_path = Path(poster['image_path']) if not isinstance(poster['image_path'], Path) else poster['image_path']
-            
-            screen_width = self.root.winfo_screenwidth()
-            screen_height = self.root.winfo_screenheight()
-            
-            full_image = self.load_and_resize_image(
-                image_path,
-                int(screen_width * 0.6),
-                int(screen_height * 0.6)
-            )
-            self.image_references[f"full_{poster['id']}"] = full_image
-            
-            image_label = tk.Label(
-                poster_frame,
-                image=full_image,
-                bg="white"
-            )
-            image_label.pack(pady=20)
-        else:
-            placeholder = tk.Label(
-                poster_frame,
-                text="No Image Available",
-                font=("Arial", 30),
-                bg="#e0e0e0",
-                width=40,
-                height=25,
-                relief="sunken"
-            )
-            placeholder.pack(pady=20)
+        self.detail_image_label = tk.Label(
+            poster_frame,
+            font=("Arial", 30),
+            bg="white"
+        )
+        self.detail_image_label.pack(pady=20)
+        
+        self.detail_zoom_canvas = ZoomCanvas(poster_frame, self.image_loader, bg="white")
         
         nav_frame = tk.Frame(poster_frame, bg="white")
         nav_frame.pack(pady=10)
+        self.detail_nav_frame = nav_frame
         
         prev_button = tk.Button(
             nav_frame,
@@ -593,8 +1173,106 @@ The posters reveal how each side wanted to define itself in opposition to the ot
             pady=5
         )
         next_button.pack(side="left", padx=10)
+        
+        zoom_button = tk.Button(
+            nav_frame,
+            text="Zoom",
+            command=self.toggle_zoom,
+            font=("Arial", 12),
+            padx=10,
+            pady=5
+        )
+        zoom_button.pack(side="left", padx=10)
+        
+        similar_frame = tk.Frame(poster_frame, bg="white")
+        similar_frame.pack(pady=(0, 10))
+        
+        self.detail_similar_title = tk.Label(
+            similar_frame,
+            font=("Arial", 12, "bold"),
+            bg="white"
+        )
+        self.detail_similar_title.grid(row=0, column=0, columnspan=5)
+        
+        self.detail_similar_slots = []
+        for slot in range(5):
+            image_label = tk.Label(similar_frame, bg="white", cursor="hand2")
+            image_label.grid(row=1, column=slot, padx=8)
+            caption_label = tk.Label(
+                similar_frame,
+                font=("Arial", 9),
+                bg="white",
+                wraplength=130,
+                cursor="hand2"
+            )
+            caption_label.grid(row=2, column=slot, padx=8)
+            self.detail_similar_slots.append((image_label, caption_label))
+        
+        return screen_frame
+    
+    def toggle_zoom(self):
+        self.set_zoom(not self.zoom_enabled)
+        if self.current_poster is not None:
+            self.show_poster_detail(self.current_poster)
+    
+    def set_zoom(self, enabled):
+        self.zoom_enabled = enabled
+        if enabled:
+            self.detail_image_label.pack_forget()
+            self.detail_zoom_canvas.pack(before=self.detail_nav_frame, fill="both", expand=True, padx=20, pady=20)
+        else:
+            self.detail_zoom_canvas.pack_forget()
+            self.detail_zoom_canvas.clear()
+            self.detail_image_label.pack(before=self.detail_nav_frame, pady=20)
+    
+    def load_zoom_pyramid(self, poster):
+        #tiles are cut once per poster version under cache/tiles and only visible ones are decoded
+        self.detail_zoom_canvas.clear()
+        if not poster.image_path or self.negative_cache.failure(poster.image_path):
+            return
+        try:
+            pyramid = TilePyramid(poster.image_path, self.cache_dir / "tiles")
+        except OSError as e:
+            print(f"Error loading image {poster.image_path}: {e}")
+            self.negative_cache.record(poster.image_path, str(e))
+            return
+        
+        def on_built(built):
+            if self.zoom_enabled and self.current_poster is poster:
+                self.detail_zoom_canvas.set_pyramid(built)
+        
+        def on_error(error):
+            print(f"Error building zoom tiles for {poster.image_path}: {error}")
+            self.negative_cache.record(poster.image_path, str(error))
+        
+        self.image_loader.submit("screen", pyramid.build, (), on_built, on_error)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="APUSH Cold War poster analysis tool")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print time spent in imports, widget construction, asset decode and catalog parse")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="write a Chrome/Perfetto trace of decode, resize, PhotoImage and screen stages to PATH (or set APUSH_TRACE)")
+    parser.add_argument("--kiosk", action="store_true",
+                        help="run an unattended full-screen slideshow with a memory watchdog")
+    parser.add_argument("--kiosk-interval", default=15.0, type=float, help="seconds per slide in kiosk mode")
+    parser.add_argument("--watchdog-interval", default=60.0, type=float,
+                        help="seconds between memory watchdog samples in kiosk mode")
+    parser.add_argument("--decode-backend", choices=("thread", "process"), default="thread",
+                        help="decode detail images on loader threads or in worker processes via shared memory")
+    args = parser.parse_args()
+    if args.trace:
+        tracer.enable(args.trace)
+    
+    profile = StartupProfile(IMPORT_START)
+    profile.add("imports", IMPORT_SECONDS)
     root = tk.Tk()
-    app = PosterAnalysisTool(root)
+    app = PosterAnalysisTool(
+        root,
+        profile=profile,
+        print_profile=args.profile_startup,
+        decode_backend=args.decode_backend,
+        kiosk_interval_ms=int(args.kiosk_interval * 1000) if args.kiosk else None,
+        watchdog_interval_ms=int(args.watchdog_interval * 1000)
+    )
     root.mainloop()
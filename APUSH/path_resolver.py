@@ -0,0 +1,218 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PureWindowsPath
+from PIL import Image
+import argparse
+import json
+import os
+import threading
+import time
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def poster_file_name(image_path):
+    #catalog entries may still carry Windows absolute paths from the original hand-maintained file
+    return PureWindowsPath(image_path).name if "\\" in image_path else Path(image_path).name
+
+
+class PathResolver:
+    #tries the path as written, then relative to the app folder, then the same file name in posters_dir,
+    #then a case-insensitive or other-extension match there (Windows never cared about case)
+    def __init__(self, base_dir, posters_dir):
+        self.base_dir = Path(base_dir)
+        self.posters_dir = Path(posters_dir)
+        self.lock = threading.Lock()
+        self.index_signature = None
+        self.by_name = {}
+        self.by_stem = {}
+
+    def refresh_index(self):
+        #one listdir per change of posters_dir instead of a stat per candidate name
+        signature = file_signature(self.posters_dir)
+        with self.lock:
+            if signature == self.index_signature:
+                return
+            by_name, by_stem = {}, {}
+            try:
+                entries = list(os.scandir(self.posters_dir))
+            except OSError:
+                entries = []
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                path = Path(entry.path)
+                by_name.setdefault(entry.name.lower(), path)
+                if path.suffix.lower() in IMAGE_EXTENSIONS:
+                    by_stem.setdefault(path.stem.lower(), path)
+            self.by_name, self.by_stem, self.index_signature = by_name, by_stem, signature
+
+    def resolve(self, image_path):
+        if not image_path:
+            return None
+        path = Path(image_path)
+        path = path if path.is_absolute() else self.base_dir / path
+        if path.is_file():
+            return path
+        name = poster_file_name(str(image_path))
+        candidate = self.posters_dir / name
+        if candidate.is_file():
+            return candidate
+        self.refresh_index()
+        return self.by_name.get(name.lower()) or self.by_stem.get(Path(name).stem.lower())
+
+    def resolve_or_keep(self, image_path):
+        #unresolved entries keep an absolute form of their path so the negative cache can still track them
+        resolved = self.resolve(image_path)
+        if resolved is not None:
+            return str(resolved)
+        if not image_path or "\\" in image_path or Path(image_path).is_absolute():
+            return image_path
+        return str(self.base_dir / image_path)
+
+
+class NegativeCache:
+    #missing or undecodable files, remembered with the stat seen at the failure; a file that appears or
+    #changes on disk is tried again, anything else is skipped without touching the decoder
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def record(self, image_path, reason):
+        with self.lock:
+            self.entries[str(image_path)] = (file_signature(image_path), reason)
+
+    def failure(self, image_path):
+        #the reason a still-unchanged path failed, or None when it is worth trying
+        key = str(image_path)
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+        signature, reason = entry
+        if file_signature(image_path) == signature:
+            return reason
+        with self.lock:
+            if self.entries.get(key) is entry:
+                del self.entries[key]
+        return None
+
+    def discard(self, image_path):
+        with self.lock:
+            self.entries.pop(str(image_path), None)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def check_image(image_path):
+    #header and structure only; a full decode of every poster would cost more than the startup it protects
+    try:
+        with Image.open(image_path) as image:
+            image.verify()
+        return None
+    except FileNotFoundError:
+        return "missing"
+    except Exception as e:
+        return f"undecodable: {e}"
+
+
+class ValidationReport:
+    def __init__(self):
+        self.ok = []
+        self.remapped = []
+        self.missing = []
+        self.broken = []
+        self.no_image = []
+        self.seconds = 0.0
+
+    def summary(self):
+        return (
+            f"Checked {len(self.ok) + len(self.missing) + len(self.broken)} poster images in {self.seconds:.2f}s: "
+            f"{len(self.ok)} ok ({len(self.remapped)} found under a different path), "
+            f"{len(self.missing)} missing, {len(self.broken)} undecodable, {len(self.no_image)} without an image"
+        )
+
+    def to_dict(self):
+        return {
+            "ok": len(self.ok),
+            "remapped": self.remapped,
+            "missing": self.missing,
+            "broken": self.broken,
+            "no_image": self.no_image,
+            "seconds": self.seconds,
+        }
+
+    def write(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+        os.replace(temp_path, path)
+
+
+def validate_catalog(entries, resolver, negative_cache, max_workers=8):
+    #entries is [(poster id, catalog image path)]; resolution and header checks run on a thread pool
+    #since both mostly wait on the disk
+    start = time.perf_counter()
+    report = ValidationReport()
+
+    def check(entry):
+        poster_id, image_path = entry
+        if not image_path:
+            return poster_id, image_path, None, None
+        resolved = resolver.resolve(image_path)
+        if resolved is None:
+            return poster_id, image_path, None, "missing"
+        return poster_id, image_path, resolved, check_image(resolved)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for poster_id, image_path, resolved, problem in executor.map(check, entries):
+            if not image_path:
+                report.no_image.append(poster_id)
+            elif problem is None:
+                report.ok.append(poster_id)
+                if Path(resolved) != resolver.base_dir / image_path:
+                    report.remapped.append({"id": poster_id, "image_path": image_path, "resolved": str(resolved)})
+            else:
+                path = resolved or resolver.resolve_or_keep(image_path)
+                negative_cache.record(path, problem)
+                (report.missing if resolved is None else report.broken).append(
+                    {"id": poster_id, "image_path": image_path, "problem": problem}
+                )
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main():
+    base_dir = Path(__file__).parent.absolute()
+    parser = argparse.ArgumentParser(description="Check that every poster in the catalog has a readable image.")
+    parser.add_argument("--json", default=base_dir / "data" / "posters.json", type=Path)
+    parser.add_argument("--posters-dir", default=base_dir / "posters", type=Path)
+    parser.add_argument("--report", default=None, type=Path, help="also write the full report as JSON")
+    parser.add_argument("--workers", default=8, type=int)
+    args = parser.parse_args()
+
+    with open(args.json, "r", encoding="utf-8") as file:
+        posters = json.load(file)
+    resolver = PathResolver(base_dir, args.posters_dir)
+    report = validate_catalog(
+        [(poster["id"], poster.get("image_path")) for poster in posters], resolver, NegativeCache(), args.workers
+    )
+    for problem in report.missing + report.broken:
+        print(f"Poster {problem['id']}: {problem['image_path']} ({problem['problem']})")
+    print(report.summary())
+    if args.report:
+        report.write(args.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from PIL import Image, ImageTk
+import multiprocessing
+import threading
+from decode import decode_resized
+from tracing import tracer
+
+
+def init_worker():
+    #a worker inheriting APUSH_TRACE would overwrite the GUI process's trace file at exit
+    tracer.enabled = False
+
+
+def decode_to_shared_memory(image_path, max_width, max_height, mode):
+    #runs in a worker process; only the segment name and geometry are pickled back
+    image = decode_resized(image_path, max_width, max_height, mode)
+    if image.mode in ("1", "L"):
+        image, frame_mode, rawmode = image.convert("L"), "L", "L"
+    elif image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        image, frame_mode, rawmode = image.convert("RGBA"), "RGBA", "RGBA"
+    else:
+        #RGBX pads each pixel to four bytes with 0xFF, which maps straight onto an opaque RGBA image
+        image, frame_mode, rawmode = image.convert("RGB"), "RGBA", "RGBX"
+    pixels = image.tobytes("raw", rawmode)
+
+    segment = shared_memory.SharedMemory(create=True, size=len(pixels))
+    try:
+        segment.buf[:len(pixels)] = pixels
+    except BaseException:
+        segment.close()
+        segment.unlink()
+        raise
+    segment.close()
+    return segment.name, frame_mode, image.size
+
+
+class SharedFrame:
+    #decoded pixels still sitting in a worker's shared-memory segment
+    def __init__(self, name, mode, size):
+        self.segment = shared_memory.SharedMemory(name=name)
+        self.mode = mode
+        self.size = size
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    def photo(self):
+        #Tk copies straight out of the mapped segment; L and RGBA need no conversion on the way
+        try:
+            view = Image.frombuffer(self.mode, self.size, self.segment.buf, "raw", self.mode, 0, 1)
+            photo_image = ImageTk.PhotoImage(view)
+            del view
+        finally:
+            self.release()
+        return photo_image
+
+    def image(self):
+        try:
+            return Image.frombuffer(self.mode, self.size, self.segment.buf, "raw", self.mode, 0, 1).copy()
+        finally:
+            self.release()
+
+    def release(self):
+        if self.segment is None:
+            return
+        self.segment.close()
+        self.segment.unlink()
+        self.segment = None
+
+    def __del__(self):
+        #results dropped by a cancelled loader group still have to give their segment back
+        try:
+            self.release()
+        except Exception:
+            pass
+
+
+def to_photo(decoded):
+    #returns (PIL image or None, PhotoImage); shared frames keep only Tk's copy of the pixels
+    if isinstance(decoded, SharedFrame):
+        return None, decoded.photo()
+    return decoded, ImageTk.PhotoImage(decoded)
+
+
+class ProcessDecoder:
+    #open, decode and resize in worker processes; callers block once max_in_flight jobs are queued
+    def __init__(self, max_workers=2, max_in_flight=8, poll_seconds=0.25):
+        self.max_workers = max_workers
+        self.slots = threading.BoundedSemaphore(max_in_flight)
+        self.poll_seconds = poll_seconds
+        self.executor = None
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def ensure_executor(self):
+        #spawn rather than fork: the GUI process has Tk and loader threads we must not duplicate
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("process decoder is shut down")
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_worker
+                )
+            return self.executor
+
+    def decode(self, image_path, max_width, max_height, mode="quality"):
+        while not self.slots.acquire(timeout=self.poll_seconds):
+            if self.closed:
+                raise RuntimeError("process decoder is shut down")
+        try:
+            with tracer.span("process decode", path=image_path):
+                future = self.ensure_executor().submit(
+                    decode_to_shared_memory, str(image_path), max_width, max_height, mode
+                )
+                name, frame_mode, size = future.result()
+        finally:
+            self.slots.release()
+        return SharedFrame(name, frame_mode, size)
+
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,204 @@
+from bisect import bisect_left, insort
+import heapq
+import re
+import threading
+import unicodedata
+
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "designer": 2.0,
+    "year": 2.0,
+    "explanation": 1.0,
+}
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    if text is None:
+        return []
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    #token -> {poster id: weight}; the sorted vocabulary answers prefix queries with bisect
+    def __init__(self, max_prefix_expansions=50):
+        self.max_prefix_expansions = max_prefix_expansions
+        self.postings = {}
+        self.doc_terms = {}
+        self.positions = {}
+        self.vocabulary = []
+        #token -> its poster ids in rank order, sorted on first use by a limited prefix query
+        self.ranked = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        index = cls()
+        for position, (record, explanation) in enumerate(catalog.iter_explanations()):
+            index.add(record, explanation, position)
+        return index
+
+    def document_terms(self, record, explanation):
+        terms = {}
+        fields = {
+            "title": record.title,
+            "designer": record.designer,
+            "year": record.year,
+            "explanation": explanation,
+        }
+        for field, value in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(value):
+                terms[token] = terms.get(token, 0.0) + weight
+        return terms
+
+    def add(self, record, explanation, position=None):
+        terms = self.document_terms(record, explanation)
+        with self.lock:
+            if record.id in self.doc_terms:
+                self.remove_locked(record.id)
+            self.doc_terms[record.id] = terms
+            self.positions[record.id] = position if position is not None else len(self.positions)
+            for token, weight in terms.items():
+                self.ranked.pop(token, None)
+                documents = self.postings.get(token)
+                if documents is None:
+                    documents = self.postings[token] = {}
+                    insort(self.vocabulary, token)
+                documents[record.id] = weight
+
+    def update(self, record, explanation, position=None):
+        if position is None:
+            position = self.positions.get(record.id)
+        self.add(record, explanation, position)
+
+    def set_positions(self, positions):
+        #catalog order only breaks score ties, so a reorder never needs re-tokenizing
+        with self.lock:
+            self.positions = {poster_id: positions[poster_id] for poster_id in self.doc_terms if poster_id in positions}
+            self.ranked = {}
+
+    def remove(self, poster_id):
+        with self.lock:
+            self.remove_locked(poster_id)
+
+    def remove_locked(self, poster_id):
+        terms = self.doc_terms.pop(poster_id, None)
+        self.positions.pop(poster_id, None)
+        if terms is None:
+            return
+        for token in terms:
+            self.ranked.pop(token, None)
+            documents = self.postings.get(token)
+            if documents is None:
+                continue
+            documents.pop(poster_id, None)
+            if not documents:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def expansions(self, prefix):
+        #the prefix's completions with their factor: exact hits score in full, longer completions slightly less
+        #so "war" ranks above "warsaw"; a short prefix keeps only its most common completions so one letter
+        #stays cheap
+        start = bisect_left(self.vocabulary, prefix)
+        end = bisect_left(self.vocabulary, prefix + "\uffff", start)
+        tokens = self.vocabulary[start:end]
+        if len(tokens) > self.max_prefix_expansions:
+            tokens = heapq.nlargest(self.max_prefix_expansions, tokens, key=lambda token: len(self.postings[token]))
+            if prefix in self.postings and prefix not in tokens:
+                tokens.append(prefix)
+        return [(token, 1.0 if token == prefix else 0.8) for token in tokens]
+
+    def prefix_matches(self, expansions):
+        matches = {}
+        for token, factor in expansions:
+            for poster_id, weight in self.postings[token].items():
+                score = weight * factor
+                if score > matches.get(poster_id, 0.0):
+                    matches[poster_id] = score
+        return matches
+
+    def match_scores(self, tokens):
+        #every term must match. The exact terms are intersected first, rarest first, and the last token's
+        #completions are only probed for the posters that survive, unless merging them is cheaper.
+        exact = sorted((self.postings.get(token, {}) for token in tokens[:-1]), key=len)
+        expansions = self.expansions(tokens[-1])
+        if not exact:
+            return self.prefix_matches(expansions)
+        scores = dict(exact[0])
+        for matches in exact[1:]:
+            scores = {poster_id: score + matches[poster_id] for poster_id, score in scores.items() if poster_id in matches}
+            if not scores:
+                return scores
+        postings = [(self.postings[token], factor) for token, factor in expansions]
+        if len(scores) * len(postings) > sum(len(documents) for documents, factor in postings):
+            matches = self.prefix_matches(expansions)
+            return {poster_id: score + matches[poster_id] for poster_id, score in scores.items() if poster_id in matches}
+        probed = {}
+        for poster_id, score in scores.items():
+            best = 0.0
+            for documents, factor in postings:
+                weight = documents.get(poster_id)
+                if weight is not None and weight * factor > best:
+                    best = weight * factor
+            if best:
+                probed[poster_id] = score + best
+        return probed
+
+    def ranked_postings(self, token):
+        ranked = self.ranked.get(token)
+        if ranked is None:
+            #two stable sorts with C-level keys: catalog order first, then weight, highest first
+            documents = self.postings[token]
+            ranked = sorted(documents, key=self.positions.get)
+            ranked.sort(key=documents.__getitem__, reverse=True)
+            self.ranked[token] = ranked
+        return ranked
+
+    def ranked_stream(self, token, factor):
+        #(-score, position, poster id) in rank order, built only as far as the merge reads
+        documents = self.postings[token]
+        positions = self.positions
+        for poster_id in self.ranked_postings(token):
+            yield -documents[poster_id] * factor, positions.get(poster_id, 0), poster_id
+
+    def top_prefix_matches(self, expansions, limit):
+        #a merge of the completions' postings, each already in rank order, so the best few need no full merge;
+        #a poster's first appearance carries its best score
+        streams = [self.ranked_stream(token, factor) for token, factor in expansions]
+        found = []
+        seen = set()
+        for score, position, poster_id in heapq.merge(*streams):
+            if poster_id not in seen:
+                seen.add(poster_id)
+                found.append(poster_id)
+                if len(found) == limit:
+                    break
+        return found
+
+    def search(self, query, limit=None):
+        return self.search_page(query, limit)[0]
+
+    def search_page(self, query, limit=None):
+        #the best limit matches, or all of them in rank order, and how many posters match in total
+        tokens = tokenize(query)
+        if not tokens:
+            return [], 0
+        with self.lock:
+            if limit and len(tokens) == 1:
+                expansions = self.expansions(tokens[0])
+                total = len(set().union(*(self.postings[token] for token, factor in expansions)))
+                return self.top_prefix_matches(expansions, limit), total
+            scores = self.match_scores(tokens)
+            positions = self.positions
+            if limit:
+                #a bounded heap instead of sorting every match when only the best few are shown
+                found = heapq.nlargest(limit, scores, key=lambda poster_id: (scores[poster_id], -positions.get(poster_id, 0)))
+                return found, len(scores)
+            return sorted(scores, key=lambda poster_id: (-scores[poster_id], positions.get(poster_id, 0))), len(scores)
+
+    def __len__(self):
+        return len(self.doc_terms)
@@ -0,0 +1,557 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from email.utils import formatdate
+from html import escape
+from pathlib import Path
+from PIL import Image
+from urllib.parse import urlsplit, unquote
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import time
+from catalog import PosterCatalog
+from content import HISTORICAL_TEXT, RESULTS_TEXT, RESPONSE_FIGURES
+from decode import decode_resized, fit_size
+from export import (
+    GALLERY_PAGE_SIZE, SPRITE_CELL, STYLESHEET, VARIANT_WIDTHS, gallery_page_name, page_html, poster_page_name,
+    render_context, render_poster, save_atomic, source_key
+)
+from common import BASE_DIR
+from layout import DETAIL_LADDER, THUMBNAIL_BUCKETS, snap_down
+from live_reload import reload_catalog
+from path_resolver import NegativeCache, PathResolver
+from process_decoder import init_worker
+
+#every width a client may ask for snaps down to one of these, so the variants per image stay bounded
+WIDTH_LADDER = tuple(sorted({*VARIANT_WIDTHS, *DETAIL_LADDER, *(width for width, height in THUMBNAIL_BUCKETS)}))
+SERVER_STYLESHEET = STYLESHEET + ".thumb { display: block; width: 150px; height: 100px; margin: 0 auto; object-fit: contain; }\n"
+MAX_HEADER_BYTES = 16384
+STATUS_TEXT = {
+    200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 500: "Internal Server Error",
+}
+IMAGE_NAME = re.compile(r"^(\w+?)-(\d+|thumb)\.jpg$")
+
+
+def render_variant(source, target, width, height):
+    #runs in a worker process; the encoded JPEG is kept on disk so a restarted server starts warm
+    target = Path(target)
+    if not target.exists():
+        save_atomic(decode_resized(source, width, height, "quality"), target)
+    return target.read_bytes()
+
+
+def read_dimensions(source):
+    with Image.open(source) as image:
+        return image.size
+
+
+def strong_etag(body):
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+def etag_matches(header, etag):
+    #If-None-Match uses the weak comparison, so a W/ prefix added by a proxy still matches
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+class Response:
+    __slots__ = ("status", "body", "content_type", "etag", "cache_control")
+
+    def __init__(self, status, body=b"", content_type="text/plain; charset=utf-8", etag=None, cache_control="no-cache"):
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.etag = etag
+        self.cache_control = cache_control
+
+
+class HttpError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or STATUS_TEXT[status])
+        self.status = status
+
+
+class RenderCache:
+    #finished responses in an LRU bounded by bytes, plus the renders still running; concurrent requests
+    #for the same key share one task, so the work grows with distinct keys rather than with requests
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.total_bytes = 0
+        self.renders = 0
+        self.hits = 0
+        self.joins = 0
+
+    async def get(self, key, compute):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        task = self.in_flight.get(key)
+        if task is None:
+            self.renders += 1
+            task = asyncio.ensure_future(compute())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda finished: self.finish(key, finished))
+        else:
+            self.joins += 1
+        #a client hanging up must not cancel the render other clients are waiting on
+        return await asyncio.shield(task)
+
+    def finish(self, key, task):
+        self.in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        value = task.result()
+        size = len(value.body) if isinstance(value, Response) else 0
+        if size > self.max_bytes:
+            return
+        self.entries[key] = value
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            old_key, old_value = self.entries.popitem(last=False)
+            self.total_bytes -= len(old_value.body) if isinstance(old_value, Response) else 0
+
+    def discard(self, predicate):
+        for key in [key for key in self.entries if predicate(key)]:
+            value = self.entries.pop(key)
+            self.total_bytes -= len(value.body) if isinstance(value, Response) else 0
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "renders": self.renders,
+            "hits": self.hits,
+            "joins": self.joins,
+            "in_flight": len(self.in_flight),
+        }
+
+
+class PosterServer:
+    def __init__(self, json_path, posters_dir, cache_dir, workers=None, max_cache_bytes=256 * 1024 * 1024,
+                 reload_check_seconds=1.0):
+        self.json_path = Path(json_path)
+        self.posters_dir = Path(posters_dir)
+        self.resolver = PathResolver(BASE_DIR, self.posters_dir)
+        #broken files answer 404 straight away instead of failing a decode on every request
+        self.negative_cache = NegativeCache()
+        self.variants_dir = Path(cache_dir) / "server"
+        self.workers = workers
+        self.reload_check_seconds = reload_check_seconds
+        self.cache = RenderCache(max_cache_bytes)
+        self.catalog = PosterCatalog()
+        self.ids = {}
+        self.generation = 0
+        self.signature = None
+        self.checked_at = 0.0
+        self.reloading = None
+        self.executor = None
+        self.requests = 0
+        self.not_modified = 0
+        self.started = time.time()
+
+    def resolve_paths(self, catalog):
+        for record in catalog:
+            source = self.resolver.resolve(record.image_path)
+            record.image_path = str(source) if source is not None else None
+
+    def read_signature(self):
+        try:
+            stat = os.stat(self.json_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load_catalog(self):
+        try:
+            with open(self.json_path, "r", encoding="utf-8") as file:
+                catalog = PosterCatalog.from_dicts(json.load(file))
+        except FileNotFoundError:
+            print(f"Error: JSON file '{self.json_path}' not found. Using empty poster list.")
+            catalog = PosterCatalog()
+        except (json.JSONDecodeError, KeyError, ValueError) as e:
+            print(f"Error: Invalid poster data in '{self.json_path}': {e}. Using empty poster list.")
+            catalog = PosterCatalog()
+        self.resolve_paths(catalog)
+        self.set_catalog(catalog)
+        self.signature = self.read_signature()
+        self.checked_at = time.monotonic()
+        print(f"Successfully loaded {len(self.catalog)} posters from {self.json_path}")
+
+    def set_catalog(self, catalog):
+        self.catalog = catalog
+        self.ids = {str(record.id): record.id for record in catalog}
+        self.generation += 1
+        #pages and API bodies depend on the catalog; image variants are keyed by their source file instead
+        self.cache.discard(lambda key: key[0] in ("page", "api"))
+
+    async def refresh_catalog(self):
+        #a stat at most once per reload_check_seconds; the parse and diff run off the event loop
+        if self.reloading is not None:
+            #the request that started the reload reports its errors; everyone else keeps the old catalog
+            try:
+                await asyncio.shield(self.reloading)
+            except Exception:
+                pass
+            return
+        now = time.monotonic()
+        if now - self.checked_at < self.reload_check_seconds:
+            return
+        self.checked_at = now
+        signature = self.read_signature()
+        if signature is None or signature == self.signature:
+            return
+        self.reloading = asyncio.ensure_future(
+            asyncio.to_thread(reload_catalog, self.json_path, self.catalog, self.resolve_paths)
+        )
+        try:
+            catalog, diff = await asyncio.shield(self.reloading)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reloading '{self.json_path}': {e}. Keeping the current posters.")
+            return
+        finally:
+            self.reloading = None
+        self.signature = signature
+        if diff:
+            self.set_catalog(catalog)
+            print(f"Reloaded {self.json_path}: {diff}")
+
+    def ensure_executor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=init_worker
+            )
+        return self.executor
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        self.variants_dir.mkdir(parents=True, exist_ok=True)
+        self.load_catalog()
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        print(f"Serving {len(self.catalog)} posters on http://{host}:{port}/")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if self.executor is not None:
+                #wait, so no decode worker outlives the server
+                self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=15)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.write_response(writer, "GET", Response(400, b"Request header too large"), close=True)
+                    break
+                method, target, version, headers = self.parse_head(head)
+                close = headers.get("connection", "").lower() == "close" or version == "HTTP/1.0"
+                response = await self.respond(method, target, headers)
+                await self.write_response(writer, method, response, close)
+                if close:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def parse_head(self, head):
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            return "GET", "", "HTTP/1.0", {}
+        headers = {}
+        for line in lines[1:]:
+            name, separator, value = line.partition(":")
+            if separator:
+                headers[name.strip().lower()] = value.strip()
+        return method, target, version, headers
+
+    async def respond(self, method, target, headers):
+        self.requests += 1
+        if method not in ("GET", "HEAD"):
+            return Response(405, b"Only GET and HEAD are supported")
+        try:
+            await self.refresh_catalog()
+            response = await self.route(target, headers.get("if-none-match"))
+        except HttpError as e:
+            return Response(e.status, str(e).encode("utf-8"))
+        except Exception as e:
+            print(f"Error serving {target}: {e}")
+            return Response(500, b"Internal Server Error")
+        if response.status == 200 and response.etag and etag_matches(headers.get("if-none-match"), response.etag):
+            response = Response(304, etag=response.etag, cache_control=response.cache_control)
+        if response.status == 304:
+            self.not_modified += 1
+        return response
+
+    async def write_response(self, writer, method, response, close):
+        lines = [
+            f"HTTP/1.1 {response.status} {STATUS_TEXT[response.status]}",
+            f"Date: {formatdate(usegmt=True)}",
+            f"Cache-Control: {response.cache_control}",
+            f"Connection: {'close' if close else 'keep-alive'}",
+        ]
+        if response.etag:
+            lines.append(f"ETag: {response.etag}")
+        if response.status != 304:
+            lines.append(f"Content-Type: {response.content_type}")
+            lines.append(f"Content-Length: {len(response.body)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if method != "HEAD" and response.status != 304:
+            writer.write(response.body)
+        await writer.drain()
+
+    async def route(self, target, if_none_match=None):
+        parts = urlsplit(target)
+        path = unquote(parts.path)
+        if path in ("/", "/index.html"):
+            return await self.page("index.html", lambda: self.render_gallery_page(0))
+        if path == "/style.css":
+            return await self.text("style.css", SERVER_STYLESHEET, "text/css; charset=utf-8")
+        if path == "/context.html":
+            return await self.page("context.html", self.render_context_page)
+        match = re.fullmatch(r"/gallery-(\d+)\.html", path)
+        if match:
+            return await self.page(path[1:], lambda: self.render_gallery_page(int(match.group(1)) - 1))
+        match = re.fullmatch(r"/poster-(\w+)\.html", path)
+        if match:
+            record = self.record(match.group(1))
+            return await self.page(path[1:], lambda: self.render_poster_page(record))
+        if path == "/api/posters":
+            return await self.api(path, self.gallery_data)
+        match = re.fullmatch(r"/api/posters/(\w+)", path)
+        if match:
+            record = self.record(match.group(1))
+            return await self.api(path, lambda: self.detail_data(record))
+        if path == "/api/stats":
+            return self.json_response(self.stats())
+        if path.startswith("/images/"):
+            return await self.image(path[len("/images/"):], if_none_match)
+        raise HttpError(404)
+
+    def record(self, poster_id):
+        if poster_id not in self.ids:
+            raise HttpError(404, f"No poster {poster_id}")
+        return self.catalog.get(self.ids[poster_id])
+
+    def json_response(self, data):
+        body = json.dumps(data).encode("utf-8")
+        return Response(200, body, "application/json", strong_etag(body))
+
+    async def text(self, name, text, content_type):
+        async def build():
+            body = text.encode("utf-8")
+            return Response(200, body, content_type, strong_etag(body))
+        return await self.cache.get(("static", name), build)
+
+    async def page(self, name, render):
+        #keyed by catalog generation so a reload never serves a page built from the old catalog
+        async def build():
+            body = (await render()).encode("utf-8")
+            return Response(200, body, "text/html; charset=utf-8", strong_etag(body))
+        return await self.cache.get(("page", self.generation, name), build)
+
+    async def api(self, name, collect):
+        async def build():
+            return self.json_response(await collect())
+        return await self.cache.get(("api", self.generation, name), build)
+
+    async def dimensions(self, source):
+        #a missing or undecodable source is a 404, remembered until the file changes on disk
+        if self.negative_cache.failure(source):
+            raise HttpError(404, "Image not found")
+        try:
+            key = source_key(source)
+        except OSError:
+            raise HttpError(404, "Image not found")
+        try:
+            size = await self.cache.get(("size", key), lambda: asyncio.to_thread(read_dimensions, source))
+        except Exception as e:
+            self.negative_cache.record(source, f"undecodable: {e}")
+            raise HttpError(404, "Image not found")
+        return key, size
+
+    async def variants(self, name, source):
+        #the same widths the static export writes, capped at the original so nothing is upscaled; pages and
+        #JSON for a poster whose image is missing or broken render without one, as the image route 404s
+        if source is None:
+            return None
+        try:
+            key, (width, height) = await self.dimensions(source)
+        except HttpError:
+            return None
+        variants = []
+        for target_width in sorted({min(variant_width, width) for variant_width in VARIANT_WIDTHS}):
+            variant_width, variant_height = fit_size(width, height, target_width, height)
+            variants.append([variant_width, variant_height, f"{name}-{target_width}.jpg"])
+        return {"width": width, "height": height, "variants": variants}
+
+    def source_of(self, name):
+        match = re.fullmatch(r"figure(\d+)", name)
+        if match:
+            index = int(match.group(1))
+            if index >= len(RESPONSE_FIGURES):
+                raise HttpError(404)
+            source = self.posters_dir / RESPONSE_FIGURES[index][0]
+            return source if source.exists() else None
+        return self.record(name).image_path
+
+    async def render_gallery_page(self, page):
+        pages = max((len(self.catalog) + GALLERY_PAGE_SIZE - 1) // GALLERY_PAGE_SIZE, 1)
+        if not 0 <= page < pages:
+            raise HttpError(404)
+        tiles = []
+        for record in self.catalog[page * GALLERY_PAGE_SIZE:(page + 1) * GALLERY_PAGE_SIZE]:
+            if record.image_path:
+                thumbnail = (
+                    f'<img class="thumb" src="images/{escape(str(record.id))}-thumb.jpg" '
+                    f'width="{SPRITE_CELL[0]}" height="{SPRITE_CELL[1]}" alt="" loading="lazy">'
+                )
+            else:
+                thumbnail = '<span class="sprite missing">No image</span>'
+            tiles.append(
+                f'<a class="tile" href="{poster_page_name(record.id)}">{thumbnail}'
+                f'<div class="title">{escape(record.title)}</div>'
+                f'<div class="info">{escape(str(record.designer))}, {escape(str(record.year))}</div></a>'
+            )
+        previous_link = f'<a href="{gallery_page_name(page - 1)}">&larr; Previous</a>' if page > 0 else "<span></span>"
+        next_link = f'<a href="{gallery_page_name(page + 1)}">Next &rarr;</a>' if page + 1 < pages else "<span></span>"
+        body = (
+            "<h1>Cold War Propaganda Posters</h1>\n"
+            '<div class="gallery">\n' + "\n".join(tiles) + "\n</div>\n"
+            f'<div class="pager">{previous_link}<span>Page {page + 1} of {pages}</span>{next_link}</div>'
+        )
+        return page_html("Poster Gallery", body)
+
+    async def render_poster_page(self, record):
+        previous_record = self.catalog.previous_of(record.id)
+        next_record = self.catalog.next_of(record.id)
+        return render_poster({
+            "poster": {
+                "title": record.title,
+                "designer": record.designer,
+                "year": record.year,
+                "explanation": self.catalog.explanation_of(record),
+            },
+            "image": await self.variants(str(record.id), record.image_path),
+            "previous": [previous_record.id, previous_record.title] if previous_record else None,
+            "next": [next_record.id, next_record.title] if next_record else None,
+            "gallery_page": gallery_page_name(self.catalog.index_of(record.id) // GALLERY_PAGE_SIZE),
+        })
+
+    async def render_context_page(self):
+        figures = []
+        for index, (name, caption) in enumerate(RESPONSE_FIGURES):
+            figures.append([await self.variants(f"figure{index}", self.source_of(f"figure{index}")), caption])
+        return render_context({"historical": HISTORICAL_TEXT, "results": RESULTS_TEXT, "figures": figures})
+
+    async def gallery_data(self):
+        return [
+            {
+                "id": record.id,
+                "title": record.title,
+                "designer": record.designer,
+                "year": record.year,
+                "page": f"/{poster_page_name(record.id)}",
+                "thumbnail": f"/images/{record.id}-thumb.jpg" if record.image_path else None,
+            }
+            for record in self.catalog
+        ]
+
+    async def detail_data(self, record):
+        previous_record = self.catalog.previous_of(record.id)
+        next_record = self.catalog.next_of(record.id)
+        image = await self.variants(str(record.id), record.image_path)
+        return {
+            "id": record.id,
+            "title": record.title,
+            "designer": record.designer,
+            "year": record.year,
+            "explanation": self.catalog.explanation_of(record),
+            "width": image["width"] if image else None,
+            "height": image["height"] if image else None,
+            "variants": [
+                {"width": width, "height": height, "url": f"/images/{name}"}
+                for width, height, name in image["variants"]
+            ] if image else [],
+            "previous": previous_record.id if previous_record else None,
+            "next": next_record.id if next_record else None,
+        }
+
+    async def image(self, name, if_none_match):
+        #/images/<id>-<width>.jpg or /images/<id>-thumb.jpg; any width is served, snapped down to WIDTH_LADDER
+        match = IMAGE_NAME.fullmatch(name)
+        if not match:
+            raise HttpError(404)
+        source = self.source_of(match.group(1))
+        if source is None:
+            raise HttpError(404, "Image not found")
+        key, (width, height) = await self.dimensions(source)
+        if match.group(2) == "thumb":
+            box, label = SPRITE_CELL, "thumb"
+        else:
+            target_width = min(snap_down(int(match.group(2)), WIDTH_LADDER), width)
+            box, label = (target_width, height), str(target_width)
+        #the ETag comes from the source's stat and the variant size, so a 304 never waits on a decode
+        etag = f'"{key}-{label}"'
+        if etag_matches(if_none_match, etag):
+            return Response(304, etag=etag, cache_control="public, max-age=60")
+
+        async def build():
+            target = self.variants_dir / f"{key}-{label}.jpg"
+            loop = asyncio.get_running_loop()
+            try:
+                body = await loop.run_in_executor(self.ensure_executor(), render_variant, str(source), target, *box)
+            except Exception as e:
+                self.negative_cache.record(source, f"undecodable: {e}")
+                raise HttpError(404, "Image not found")
+            return Response(200, body, "image/jpeg", etag, "public, max-age=60")
+
+        return await self.cache.get(("image", key, label), build)
+
+    def stats(self):
+        return {
+            "posters": len(self.catalog),
+            "generation": self.generation,
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "uptime_seconds": time.time() - self.started,
+            "cache": self.cache.stats(),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the poster analysis to browsers on the local network.")
+    parser.add_argument("--json", default=BASE_DIR / "data" / "posters.json", type=Path)
+    parser.add_argument("--posters-dir", default=BASE_DIR / "posters", type=Path)
+    parser.add_argument("--cache-dir", default=BASE_DIR / "cache", type=Path)
+    parser.add_argument("--host", default="127.0.0.1", help="use 0.0.0.0 to accept other machines in the classroom")
+    parser.add_argument("--port", default=8000, type=int)
+    parser.add_argument("--workers", default=None, type=int, help="decode processes")
+    parser.add_argument("--cache-mb", default=256, type=int, help="in-memory render cache size")
+    args = parser.parse_args()
+
+    server = PosterServer(args.json, args.posters_dir, args.cache_dir, args.workers, args.cache_mb * 1024 * 1024)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
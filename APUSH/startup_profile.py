@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+import time
+
+
+class StartupProfile:
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.phases = {}
+        self.marks = {}
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        phase_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - phase_start)
+
+    def mark(self, name):
+        #wall-clock offset from process start, e.g. when the first frame painted
+        self.marks[name] = time.perf_counter() - self.start
+
+    def report(self):
+        lines = ["Startup profile:"]
+        for phase, seconds in sorted(self.phases.items(), key=lambda item: -item[1]):
+            lines.append(f"  {phase:<24}{seconds * 1000:9.1f} ms")
+        for name, seconds in sorted(self.marks.items(), key=lambda item: item[1]):
+            lines.append(f"  @ {name:<22}{seconds * 1000:9.1f} ms")
+        return "\n".join(lines)
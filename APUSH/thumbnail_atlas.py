@@ -0,0 +1,207 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from PIL import Image
+import json
+import mmap
+import os
+import threading
+from common import file_sha256
+from path_resolver import file_signature
+
+ATLAS_VERSION = 1
+#compact into a new data file once more than this share of the slots belong to no poster
+MAX_DEAD_FRACTION = 0.5
+#one build at a time: a reload can start a build while the startup one is still running, and a queued
+#cancel does not stop a build that has already begun
+BUILD_LOCK = threading.Lock()
+
+
+def atlas_name(thumbnail_size):
+    return f"atlas-{thumbnail_size[0]}x{thumbnail_size[1]}"
+
+
+def letterbox(image, thumbnail_size):
+    #every slot is the full thumbnail box, so tiles can paste into PhotoImages they already own
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    if image.size == tuple(thumbnail_size):
+        return image
+    slot = Image.new("RGB", thumbnail_size, "white")
+    slot.paste(image, ((thumbnail_size[0] - image.width) // 2, (thumbnail_size[1] - image.height) // 2))
+    return slot
+
+
+def read_index(index_path):
+    try:
+        with open(index_path, "r", encoding="utf-8") as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return index if index.get("version") == ATLAS_VERSION else None
+
+
+def build_atlas(atlas_dir, thumbnail_size, entries, create, max_workers=4):
+    #entries is [(poster id, image path)]. Posters whose file stat is unchanged keep their slot, changed files
+    #are hashed so an identical image reuses a slot, and only new content is decoded and appended.
+    #Runs on a worker thread; readers keep their mapping until they reopen the new index.
+    with BUILD_LOCK:
+        return build_atlas_locked(Path(atlas_dir), thumbnail_size, entries, create, max_workers)
+
+
+def build_atlas_locked(atlas_dir, thumbnail_size, entries, create, max_workers):
+    atlas_dir.mkdir(parents=True, exist_ok=True)
+    name = atlas_name(thumbnail_size)
+    index_path = atlas_dir / f"{name}.json"
+    slot_bytes = thumbnail_size[0] * thumbnail_size[1] * 3
+    index = read_index(index_path) or {
+        "version": ATLAS_VERSION, "size": list(thumbnail_size), "data": None, "slots": 0, "posters": {}, "hashes": {}
+    }
+    data_path = atlas_dir / index["data"] if index["data"] else None
+    if data_path is None or file_signature(data_path) is None or os.path.getsize(data_path) < index["slots"] * slot_bytes:
+        index.update(data=None, slots=0, posters={}, hashes={})
+
+    old_posters = index["posters"]
+    posters = {}
+    pending = {}
+    for poster_id, image_path in entries:
+        signature = file_signature(image_path) if image_path else None
+        if signature is None:
+            continue
+        key = str(poster_id)
+        old = old_posters.get(key)
+        if old is not None and old["path"] == str(image_path) and tuple(old["signature"]) == signature:
+            posters[key] = old
+        else:
+            pending[key] = (str(image_path), list(signature))
+
+    def render(item):
+        key, (image_path, signature) = item
+        content_hash = file_sha256(image_path)
+        if content_hash in index["hashes"]:
+            return key, image_path, signature, content_hash, None
+        return key, image_path, signature, content_hash, letterbox(create(image_path, *thumbnail_size), thumbnail_size)
+
+    live_hashes = {entry["hash"] for entry in posters.values()}
+    new_slots = []
+    errors = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(render, item) for item in pending.items()]
+        for future in futures:
+            try:
+                key, image_path, signature, content_hash, image = future.result()
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            if image is not None and content_hash not in index["hashes"]:
+                index["hashes"][content_hash] = index["slots"] + len(new_slots)
+                new_slots.append(image)
+            posters[key] = {"path": image_path, "signature": signature, "hash": content_hash}
+            live_hashes.add(content_hash)
+
+    dead = index["slots"] + len(new_slots) - len(live_hashes)
+    if index["data"] is None or dead > MAX_DEAD_FRACTION * max(index["slots"] + len(new_slots), 1):
+        compact(atlas_dir, name, index, live_hashes, new_slots, slot_bytes)
+    elif new_slots:
+        #readers only map the first index["slots"] slots, so writing past them is invisible until the new
+        #index lands; writing at that offset rather than the end also overwrites what an interrupted build left
+        with open(data_path, "r+b") as file:
+            file.seek(index["slots"] * slot_bytes)
+            for image in new_slots:
+                file.write(image.tobytes())
+        index["slots"] += len(new_slots)
+
+    index["posters"] = posters
+    temp_path = index_path.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(index, file)
+    os.replace(temp_path, index_path)
+    return {"added": len(new_slots), "reused": len(posters) - len(pending), "slots": index["slots"], "errors": errors}
+
+
+def compact(atlas_dir, name, index, live_hashes, new_slots, slot_bytes):
+    #live slots and new ones go to a fresh data file under a new name, written to a temp file first so an
+    #interrupted build never leaves a short file behind; a mapped file cannot be truncated or replaced on Windows
+    generation = int(index["data"].rsplit("-", 1)[1].split(".")[0]) + 1 if index["data"] else 1
+    data_name = f"{name}-{generation}.bin"
+    old_path = atlas_dir / index["data"] if index["data"] else None
+    temp_path = atlas_dir / f"{data_name}.tmp"
+    hashes = {}
+    with open(temp_path, "wb") as target:
+        if old_path is not None:
+            with open(old_path, "rb") as source:
+                for content_hash, slot in sorted(index["hashes"].items(), key=lambda item: item[1]):
+                    if content_hash in live_hashes and slot < index["slots"]:
+                        source.seek(slot * slot_bytes)
+                        target.write(source.read(slot_bytes))
+                        hashes[content_hash] = len(hashes)
+        for content_hash, slot in index["hashes"].items():
+            if slot >= index["slots"] and content_hash in live_hashes:
+                target.write(new_slots[slot - index["slots"]].tobytes())
+                hashes[content_hash] = len(hashes)
+    os.replace(temp_path, atlas_dir / data_name)
+    index.update(data=data_name, slots=len(hashes), hashes=hashes)
+    for stale in atlas_dir.glob(f"{name}-*.bin"):
+        if stale.name != data_name:
+            try:
+                stale.unlink()
+            except OSError:
+                #still mapped by a reader on Windows; the next compaction tries again
+                pass
+
+
+class ThumbnailAtlas:
+    #read side: one mapping of the data file, and a tile is a slice of it with no open or decode
+    def __init__(self, atlas_dir, thumbnail_size):
+        self.atlas_dir = Path(atlas_dir)
+        self.thumbnail_size = tuple(thumbnail_size)
+        self.slot_bytes = self.thumbnail_size[0] * self.thumbnail_size[1] * 3
+        self.index_path = self.atlas_dir / f"{atlas_name(self.thumbnail_size)}.json"
+        self.slots = {}
+        self.file = None
+        self.mapping = None
+        self.mapped_slots = 0
+
+    def open(self):
+        index = read_index(self.index_path)
+        self.close()
+        if index is None or not index["data"] or index["slots"] == 0:
+            return False
+        try:
+            self.file = open(self.atlas_dir / index["data"], "rb")
+            self.mapping = mmap.mmap(self.file.fileno(), index["slots"] * self.slot_bytes, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            print(f"Error opening thumbnail atlas {self.index_path}: {e}")
+            self.close()
+            return False
+        self.mapped_slots = index["slots"]
+        hashes = index["hashes"]
+        self.slots = {
+            key: (entry["path"], tuple(entry["signature"]), hashes[entry["hash"]])
+            for key, entry in index["posters"].items()
+            if hashes.get(entry["hash"], self.mapped_slots) < self.mapped_slots
+        }
+        return True
+
+    def close(self):
+        self.slots = {}
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __len__(self):
+        return len(self.slots)
+
+    def image(self, poster_id, image_path):
+        #None when the poster is not in the atlas yet or its file changed since the last build; a stat is
+        #the only file system call, and the pixels are copied out so no view outlives the mapping
+        entry = self.slots.get(str(poster_id))
+        if entry is None:
+            return None
+        path, signature, slot = entry
+        if path != str(image_path) or file_signature(image_path) != signature:
+            return None
+        start = slot * self.slot_bytes
+        return Image.frombytes("RGB", self.thumbnail_size, self.mapping[start:start + self.slot_bytes])
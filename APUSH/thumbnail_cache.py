@@ -0,0 +1,88 @@
+from PIL import Image
+from pathlib import Path
+import hashlib
+import os
+import threading
+
+
+class ThumbnailCache:
+    def __init__(self, cache_dir, max_bytes=50 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        #thumbnails are written from the background loader threads
+        self.lock = threading.Lock()
+        self.total_bytes = sum(f.stat().st_size for f in self.cache_dir.glob("*.png"))
+
+    def make_key(self, image_path, max_width, max_height, resample):
+        #mtime + size of the source file go into the key so an edited poster gets a new entry
+        stat = os.stat(image_path)
+        raw = f"{Path(image_path).resolve()}|{stat.st_mtime_ns}|{stat.st_size}|{max_width}x{max_height}|{resample}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        cached_path = self.cache_dir / f"{key}.png"
+        try:
+            image = Image.open(cached_path)
+            image.load()
+        except (FileNotFoundError, OSError):
+            return None
+        try:
+            os.utime(cached_path)
+        except OSError:
+            pass
+        return image
+
+    def put(self, key, image):
+        cached_path = self.cache_dir / f"{key}.png"
+        temp_path = self.cache_dir / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA")
+        try:
+            image.save(temp_path, format="PNG")
+            with self.lock:
+                old_size = cached_path.stat().st_size if cached_path.exists() else 0
+                os.replace(temp_path, cached_path)
+                self.total_bytes += cached_path.stat().st_size - old_size
+                if self.total_bytes > self.max_bytes:
+                    self.evict()
+        except OSError as e:
+            print(f"Error writing thumbnail cache entry {cached_path}: {e}")
+            temp_path.unlink(missing_ok=True)
+
+    def get_or_create(self, image_path, max_width, max_height, resample, create):
+        key = self.make_key(image_path, max_width, max_height, resample)
+        image = self.get(key)
+        if image is None:
+            image = create(image_path, max_width, max_height)
+            self.put(key, image)
+        return image
+
+    def evict(self):
+        #least recently used first; get() touches the mtime on every hit
+        entries = []
+        for cached_path in self.cache_dir.glob("*.png"):
+            try:
+                stat = cached_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, cached_path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, cached_path in entries:
+            if total <= target:
+                break
+            try:
+                cached_path.unlink()
+                total -= size
+            except FileNotFoundError:
+                total -= size
+        self.total_bytes = total
+
+    def clear(self):
+        with self.lock:
+            for cached_path in self.cache_dir.glob("*.png"):
+                cached_path.unlink(missing_ok=True)
+            self.total_bytes = 0
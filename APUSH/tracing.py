@@ -0,0 +1,108 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+
+class Tracer:
+    #writes Chrome trace-event JSON, which chrome://tracing and ui.perfetto.dev both open
+    def __init__(self):
+        self.enabled = False
+        self.output_path = None
+        self.events = []
+        self.durations = {}
+        self.screen = "startup"
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+
+    def enable(self, output_path):
+        if not self.enabled:
+            atexit.register(self.write)
+        self.enabled = True
+        self.output_path = output_path
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, args)
+
+    def set_screen(self, name):
+        self.screen = name
+
+    def record(self, name, start, end, args):
+        event = {
+            "name": name,
+            "cat": self.screen,
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = {key: str(value) for key, value in args.items()}
+        with self.lock:
+            self.events.append(event)
+            count, total, slowest = self.durations.get((self.screen, name), (0, 0.0, 0.0))
+            self.durations[(self.screen, name)] = (count + 1, total + end - start, max(slowest, end - start))
+
+    def summary(self, top=5):
+        with self.lock:
+            by_screen = {}
+            for (screen, name), stats in self.durations.items():
+                by_screen.setdefault(screen, []).append((name, stats))
+        lines = []
+        for screen in sorted(by_screen):
+            lines.append(f"[{screen}]")
+            stages = sorted(by_screen[screen], key=lambda item: -item[1][1])[:top]
+            for name, (count, total, slowest) in stages:
+                lines.append(f"  {name:<28}{total * 1000:9.1f} ms total {count:6d} calls {slowest * 1000:8.1f} ms max")
+        return "\n".join(lines)
+
+    def write(self):
+        if not self.enabled or not self.output_path:
+            return
+        with self.lock:
+            trace = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        try:
+            with open(self.output_path, "w", encoding="utf-8") as file:
+                json.dump(trace, file)
+            print(f"Wrote {len(trace['traceEvents'])} trace events to {self.output_path}")
+        except OSError as e:
+            print(f"Error writing trace file {self.output_path}: {e}")
+        print(self.summary())
+
+
+tracer = Tracer()
+if os.environ.get("APUSH_TRACE"):
+    tracer.enable(os.environ["APUSH_TRACE"])